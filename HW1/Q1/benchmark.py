@@ -0,0 +1,280 @@
+"""
+benchmark.py
+
+Seeded instance generator and benchmark runner for the exam scheduling CSP.
+
+- Instances use the same (courses, students, time_slots) tuple as test_cases.py.
+- Every (instance, solver) run happens in a fresh worker process, so a solver
+  that blows up can be stopped at the timeout and peak memory is not shared.
+- Results are written as CSV and/or JSON, one row per run.
+
+How to use:
+> python benchmark.py --sizes 10 100 1000 --kinds random ring clique enrollment --out results
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import random
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from exam_scheduler import ExamSchedulerCSP
+
+KINDS = ["random", "ring", "clique", "enrollment"]
+
+DEFAULT_SOLVERS = [
+    "backtracking_with_heuristics",
+    "backtracking_with_bitsets",
+    "backtracking_iterative",
+    "backtracking_with_mac",
+    "backtracking_with_cbj",
+    "solve_with_sat",
+    "min_conflicts",
+]
+
+
+# -------------------------
+# Instance generators
+# -------------------------
+def _course_names(n):
+    return [f"C{i}" for i in range(n)]
+
+
+def random_instance(n, avg_degree=6, num_slots=None, seed=0):
+    """
+    Erdos-Renyi style conflict graph: every student takes two uniformly random courses.
+    :param avg_degree: expected number of conflicts per course
+    :param num_slots: defaults to avg_degree // 2 + 2, close to the feasibility threshold
+    """
+    rng = random.Random(seed)
+    courses = _course_names(n)
+    students = {}
+    if n > 1:
+        for s in range(n * avg_degree // 2):
+            students[f"s{s}"] = rng.sample(courses, 2)
+    if num_slots is None:
+        num_slots = avg_degree // 2 + 2
+    return courses, students, list(range(1, num_slots + 1))
+
+
+def ring_instance(n, chords=0, num_slots=3, seed=0):
+    """
+    Scaled version of the H1/H2 rings in test_cases.py: course i conflicts with i+1,
+    plus 'chords' random shortcuts across the ring.
+    """
+    rng = random.Random(seed)
+    courses = _course_names(n)
+    students = {}
+    for i in range(n):
+        students[f"r{i}"] = [courses[i], courses[(i + 1) % n]]
+    for c in range(chords if n > 3 else 0):
+        students[f"x{c}"] = rng.sample(courses, 2)
+    return courses, students, list(range(1, num_slots + 1))
+
+
+def clique_instance(n, clique_size=8, overlap=0.1, num_slots=None, seed=0):
+    """
+    Courses grouped into dense cliques (e.g. a cohort taking a fixed block of courses),
+    with a fraction 'overlap' of extra students linking courses of different cliques.
+    :param num_slots: defaults to clique_size, i.e. tight but feasible for the cliques alone
+    """
+    rng = random.Random(seed)
+    courses = _course_names(n)
+    students = {}
+    for start in range(0, n, clique_size):
+        students[f"k{start}"] = courses[start:start + clique_size]
+    if n > 1:
+        for s in range(int(n * overlap)):
+            students[f"x{s}"] = rng.sample(courses, 2)
+    if num_slots is None:
+        num_slots = clique_size
+    return courses, students, list(range(1, num_slots + 1))
+
+
+def enrollment_instance(n, students_per_course=30, courses_per_student=5, faculty_size=40,
+                        elective_rate=0.2, num_slots=None, seed=0):
+    """
+    Enrollment-shaped instance: courses belong to faculties, students take most of their
+    courses inside one faculty with a skewed (Zipf-like) popularity, and a fraction
+    'elective_rate' of their courses anywhere in the university.
+    :param num_slots: defaults to the number of slots a largest-first greedy coloring needs,
+                      so the instance is feasible but not trivially loose
+    """
+    rng = random.Random(seed)
+    courses = _course_names(n)
+    faculties = [courses[i:i + faculty_size] for i in range(0, n, faculty_size)]
+    popularity = [[1.0 / (rank + 1) for rank in range(len(f))] for f in faculties]
+    students = {}
+    for s in range(max(1, n * students_per_course // courses_per_student)):
+        f = rng.randrange(len(faculties))
+        taken = set()
+        for _ in range(courses_per_student):
+            if rng.random() < elective_rate:
+                taken.add(rng.choice(courses))
+            else:
+                taken.add(rng.choices(faculties[f], weights=popularity[f])[0])
+        students[f"s{s}"] = sorted(taken)
+    if num_slots is None:
+        num_slots = greedy_slot_count(courses, students)
+    return courses, students, list(range(1, num_slots + 1))
+
+
+def greedy_slot_count(courses, students):
+    """Number of slots used by a largest-degree-first greedy coloring of the conflict graph."""
+    conflicts = ExamSchedulerCSP(courses, students, [1]).conflicts
+    slot_of = {}
+    for course in sorted(courses, key=lambda c: -len(conflicts[c])):
+        used = {slot_of[c] for c in conflicts[course] if c in slot_of}
+        slot = 0
+        while slot in used:
+            slot += 1
+        slot_of[course] = slot
+    return max(slot_of.values(), default=0) + 1
+
+
+GENERATORS = {
+    "random": random_instance,
+    "ring": ring_instance,
+    "clique": clique_instance,
+    "enrollment": enrollment_instance,
+}
+
+
+def make_instance(kind, n, seed=0):
+    return GENERATORS[kind](n, seed=seed)
+
+
+# -------------------------
+# Runner
+# -------------------------
+def _peak_kib():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_one(conn, instance, solver):
+    courses, students, time_slots = instance
+    csp = ExamSchedulerCSP(courses, students, time_slots)
+    peak_before = _peak_kib()
+    start = time.perf_counter()
+    try:
+        result = getattr(csp, solver)()
+    except Exception as e:
+        # e.g. RecursionError from the recursive solvers on large instances
+        conn.send({"status": "error", "error": repr(e)})
+        conn.close()
+        return
+    wall = time.perf_counter() - start
+    peak_after = _peak_kib()
+
+    if solver == "min_conflicts":
+        assignment, violations = result
+        status = "solved" if violations == 0 else "unsolved"
+    else:
+        status = "solved" if result is not None else "infeasible"
+    conn.send({
+        "status": status,
+        "wall_time": wall,
+        "nodes": csp.nodes_expanded,
+        "backtracks": csp.backtracks,
+        "peak_memory_kib": None if peak_before is None else peak_after - peak_before,
+    })
+    conn.close()
+
+
+def run_solver(instance, solver, timeout=60.0):
+    """
+    Solve one instance with one solver method in a separate process.
+    :return: dict with status, wall_time, nodes, backtracks, peak_memory_kib and error
+             (status is "timeout" or "error" if the worker did not report back;
+             error holds the exception repr or exit code, None otherwise)
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(target=_run_one, args=(sender, instance, solver), daemon=True)
+    worker.start()
+    sender.close()
+    row = None
+    if receiver.poll(timeout):
+        try:
+            row = receiver.recv()
+        except EOFError:
+            row = None
+    if worker.is_alive():
+        worker.terminate()
+    worker.join()
+    empty = {"status": None, "wall_time": None, "nodes": None, "backtracks": None,
+             "peak_memory_kib": None, "error": None}
+    if row is None:
+        if worker.exitcode is None or worker.exitcode < 0:
+            row = dict(empty, status="timeout")
+        else:
+            row = dict(empty, status="error", error=f"worker exited with code {worker.exitcode}")
+    elif row["status"] == "error":
+        row = dict(empty, status="error", error=row["error"])
+    else:
+        row = dict(empty, **row)
+    return row
+
+
+def run_benchmark(sizes, kinds=KINDS, solvers=DEFAULT_SOLVERS, seeds=(0,), timeout=60.0,
+                  verbose=True):
+    """
+    Run every solver on every (kind, size, seed) instance.
+    :return: list of result rows (dicts)
+    """
+    rows = []
+    for kind in kinds:
+        for n in sizes:
+            for seed in seeds:
+                instance = make_instance(kind, n, seed)
+                courses, students, time_slots = instance
+                edges = sum(len(v) for v in ExamSchedulerCSP(courses, students, time_slots)
+                            .conflicts.values()) // 2
+                for solver in solvers:
+                    row = {"kind": kind, "courses": n, "seed": seed, "slots": len(time_slots),
+                           "edges": edges, "solver": solver}
+                    row.update(run_solver(instance, solver, timeout))
+                    rows.append(row)
+                    if verbose:
+                        wall = "-" if row["wall_time"] is None else f"{row['wall_time']:.4f}s"
+                        print(f"{kind:>10} n={n:<6} seed={seed} {solver:<30} "
+                              f"{row['status']:<10} {wall:>10} nodes={row['nodes']}"
+                              + (f" ({row['error']})" if row["error"] else ""))
+    return rows
+
+
+def write_csv(rows, path):
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, path):
+    with open(path, "w") as f:
+        json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the exam scheduling CSP solvers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--solvers", nargs="+", default=DEFAULT_SOLVERS)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per run")
+    parser.add_argument("--out", default="benchmark_results",
+                        help="output prefix; writes <out>.csv and <out>.json")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.kinds, args.solvers, args.seeds, args.timeout)
+    write_csv(results, args.out + ".csv")
+    write_json(results, args.out + ".json")
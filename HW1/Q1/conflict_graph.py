@@ -0,0 +1,164 @@
+"""
+conflict_graph.py
+
+Streaming construction of the course conflict graph from registrar exports.
+
+- Enrollment rows are read one at a time from a CSV or JSONL file.
+- Course names are interned to integer ids on first sight.
+- Each student contributes every unordered pair of their courses once, and the
+  result is a CSR adjacency (indptr / indices / weights) where weights[e] is the
+  number of students shared by the two courses of edge e.
+
+How to use:
+> graph = build_conflict_graph(read_enrollments_csv("enrollments.csv"))
+> csp = ExamSchedulerCSP.from_graph(graph, [1, 2, 3])
+"""
+
+from array import array
+import csv
+import json
+
+
+def read_enrollments_csv(path, student_field="student", course_field="course"):
+    """
+    Yield (student, course) pairs from a CSV file with a header row.
+    :param student_field: name of the student id column
+    :param course_field: name of the course column
+    """
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield row[student_field], row[course_field]
+
+
+def read_enrollments_jsonl(path, student_field="student", course_field="course"):
+    """
+    Yield (student, course) pairs from a JSON-lines file.
+    A line is either {"student": ..., "course": ...} or {"student": ..., "courses": [...]}.
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            student = record[student_field]
+            if course_field in record:
+                yield student, record[course_field]
+            else:
+                for course in record[course_field + "s"]:
+                    yield student, course
+
+
+class ConflictGraph:
+    """
+    Compact, read-only course conflict graph in CSR form.
+    Neighbors of course id i are indices[indptr[i]:indptr[i+1]] (sorted), and
+    weights holds the shared-student count of each of those edges.
+    """
+    def __init__(self, names, indptr, indices, weights):
+        self.names : list = names
+        self.ids : dict = {name: i for i, name in enumerate(names)}
+        self.indptr : array = indptr
+        self.indices : array = indices
+        self.weights : array = weights
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def degree(self, i):
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def edge_weights(self, i):
+        return self.weights[self.indptr[i]:self.indptr[i + 1]]
+
+    def to_conflicts(self):
+        """:return: dict course -> set(conflicting courses), the format used by ExamSchedulerCSP"""
+        names = self.names
+        return {names[i]: {names[j] for j in self.neighbors(i)} for i in range(len(names))}
+
+
+def build_conflict_graph(enrollments, courses=None, grouped=False):
+    """
+    Build a ConflictGraph from a stream of (student, course) pairs.
+
+    :param enrollments: iterable of (student, course) pairs, e.g. from read_enrollments_csv
+    :param courses: optional list of all course names; fixes the id order and keeps
+                    courses nobody enrolled in
+    :param grouped: True if all rows of one student are contiguous in the stream; then only
+                    the current student's courses are held in memory
+    :return: ConflictGraph
+    """
+    names = list(courses) if courses is not None else []
+    ids = {name: i for i, name in enumerate(names)}
+    pair_counts = {}
+
+    def intern(course):
+        i = ids.get(course)
+        if i is None:
+            i = ids[course] = len(names)
+            names.append(course)
+        return i
+
+    def add_student(course_ids):
+        # every unordered pair once; key packs (low, high) ids into one int
+        ordered = sorted(course_ids)
+        for p, a in enumerate(ordered):
+            base = a << 32
+            for b in ordered[p + 1:]:
+                key = base | b
+                pair_counts[key] = pair_counts.get(key, 0) + 1
+
+    if grouped:
+        current, current_ids = None, set()
+        for student, course in enrollments:
+            if student != current:
+                add_student(current_ids)
+                current, current_ids = student, set()
+            current_ids.add(intern(course))
+        add_student(current_ids)
+    else:
+        by_student = {}
+        for student, course in enrollments:
+            course_id = intern(course)
+            taken = by_student.get(student)
+            if taken is None:
+                by_student[student] = taken = set()
+            taken.add(course_id)
+        for taken in by_student.values():
+            add_student(taken)
+        del by_student
+
+    n = len(names)
+    degrees = [0] * (n + 1)
+    for key in pair_counts:
+        degrees[key >> 32] += 1
+        degrees[key & 0xFFFFFFFF] += 1
+
+    indptr = array("q", [0]) * (n + 1)
+    for i in range(n):
+        indptr[i + 1] = indptr[i] + degrees[i]
+
+    # fill each row with its lower-id neighbors first, then its higher-id ones,
+    # visiting both in increasing order so every row ends up sorted
+    fill = array("q", indptr)
+    indices = array("i", [0]) * indptr[n]
+    weights = array("i", [0]) * indptr[n]
+    edges = sorted(pair_counts.items())
+    for key, count in sorted(edges, key=lambda edge: (edge[0] & 0xFFFFFFFF, edge[0] >> 32)):
+        low, high = key >> 32, key & 0xFFFFFFFF
+        indices[fill[high]] = low
+        weights[fill[high]] = count
+        fill[high] += 1
+    for key, count in edges:
+        low, high = key >> 32, key & 0xFFFFFFFF
+        indices[fill[low]] = high
+        weights[fill[low]] = count
+        fill[low] += 1
+    return ConflictGraph(names, indptr, indices, weights)
@@ -9,10 +9,432 @@ How to use:
 > python exam_scheduler.py
 """
 
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from itertools import combinations
+import heapq
+import multiprocessing
+import queue
+import random
+import sys
+import threading
 import time
-import copy
 import test_cases
+from sat_solver import SATSolver
+
+
+@contextmanager
+def _recursion_limit(depth):
+    """
+    Allow at least 'depth' nested frames (plus headroom) inside the with-block,
+    then put the previous recursion limit back.
+    """
+    previous = sys.getrecursionlimit()
+    if previous < depth + 100:
+        sys.setrecursionlimit(depth + 100)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(previous)
+
+class NogoodStore:
+    """
+    Bounded store of learned nogoods for the CBJ solver.
+    A nogood is a set of (course index, slot position) pairs that cannot all hold together.
+    Each nogood is indexed under its deepest pair so it is checked exactly when that
+    course is assigned; the oldest nogoods are evicted once 'capacity' is reached.
+    """
+    def __init__(self, capacity=10000, max_size=8):
+        self.capacity : int = capacity
+        self.max_size : int = max_size
+        self.index : dict = defaultdict(list)
+        self.order : deque = deque()
+
+    def __len__(self):
+        return len(self.order)
+
+    def learn(self, key, pairs):
+        """
+        :param key: (course index, slot position) of the deepest pair
+        :param pairs: tuple of the remaining (course index, slot position) pairs
+        """
+        if len(pairs) + 1 > self.max_size or self.capacity <= 0:
+            return
+        if len(self.order) >= self.capacity:
+            old_key, old_pairs = self.order.popleft()
+            bucket = self.index[old_key]
+            bucket.remove(old_pairs)
+            if not bucket:
+                del self.index[old_key]
+        self.index[key].append(pairs)
+        self.order.append((key, pairs))
+
+    def violated(self, key, values):
+        """
+        :param key: (course index, slot position) about to be assigned
+        :param values: list course index -> slot position (-1 if unassigned)
+        :return: (violated, bitmask of the other courses of the violated nogood);
+                 a unary nogood is violated with an empty culprit mask
+        """
+        for pairs in self.index.get(key, ()):
+            culprit = 0
+            for i, s in pairs:
+                if values[i] != s:
+                    break
+                culprit |= 1 << i
+            else:
+                return True, culprit
+        return False, 0
+
+
+class IndexedHeap:
+    """
+    Binary min-heap over the items 0..n-1 with one integer key per item.
+    pos[item] is the item's place in the heap (-1 if not in it), so the key of any item
+    can be changed, or the item removed, in O(log n). Ties go to the smaller item.
+    """
+    __slots__ = ("heap", "pos", "keys")
+
+    def __init__(self, keys):
+        n = len(keys)
+        self.keys : array = array("q", keys)
+        self.heap : array = array("i", range(n))
+        self.pos : array = array("i", range(n))
+        for p in range(n // 2 - 1, -1, -1):
+            self._sift_down(p)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return self.pos[item] >= 0
+
+    def _less(self, a, b):
+        ka = self.keys[a]
+        kb = self.keys[b]
+        return ka < kb or (ka == kb and a < b)
+
+    def _sift_up(self, p):
+        heap, pos = self.heap, self.pos
+        item = heap[p]
+        while p:
+            parent = (p - 1) >> 1
+            above = heap[parent]
+            if not self._less(item, above):
+                break
+            heap[p] = above
+            pos[above] = p
+            p = parent
+        heap[p] = item
+        pos[item] = p
+
+    def _sift_down(self, p):
+        heap, pos = self.heap, self.pos
+        n = len(heap)
+        item = heap[p]
+        while True:
+            child = 2 * p + 1
+            if child >= n:
+                break
+            if child + 1 < n and self._less(heap[child + 1], heap[child]):
+                child += 1
+            below = heap[child]
+            if not self._less(below, item):
+                break
+            heap[p] = below
+            pos[below] = p
+            p = child
+        heap[p] = item
+        pos[item] = p
+
+    def push(self, item, key):
+        self.keys[item] = key
+        self.pos[item] = len(self.heap)
+        self.heap.append(item)
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """Remove and return the item with the smallest key."""
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        self.pos[top] = -1
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top
+
+    def update(self, item, key):
+        """Change the key of an item that is in the heap."""
+        old = self.keys[item]
+        self.keys[item] = key
+        if key < old:
+            self._sift_up(self.pos[item])
+        elif key > old:
+            self._sift_down(self.pos[item])
+
+
+class SearchCore:
+    """
+    Integer-indexed search state for iter_solutions / backtracking_iterative.
+    Courses are 0..n-1 and slots are bit positions, all state lives in flat arrays,
+    and unassigned courses sit in an IndexedHeap keyed by (domain size, -degree),
+    so MRV + Degree selection is a heap pop instead of a scan over every course.
+    Names are only looked up again when the solution is decoded.
+    """
+    __slots__ = ("neighbors", "domains", "sizes", "degrees", "values", "span", "heap", "trail")
+
+    def __init__(self, domain_masks, neighbor_lists):
+        n = len(domain_masks)
+        self.neighbors : list = neighbor_lists
+        self.domains : list = list(domain_masks)
+        self.sizes : array = array("i", [mask.bit_count() for mask in domain_masks])
+        self.degrees : array = array("i", [len(neighbors) for neighbors in neighbor_lists])
+        self.values : array = array("i", [-1]) * n
+        # key = size * span + (span - 1 - degree): smaller domain first, then higher degree
+        self.span : int = max(self.degrees, default=0) + 1
+        self.heap : IndexedHeap = IndexedHeap([self.key(i) for i in range(n)])
+        # (course, old domain mask) for every pruned value, undone by truncation
+        self.trail : list = []
+
+    def key(self, i):
+        return self.sizes[i] * self.span + self.span - 1 - self.degrees[i]
+
+    def select(self):
+        """Pop the MRV/Degree course and take it out of its unassigned neighbors' degrees."""
+        var = self.heap.pop()
+        heap, degrees = self.heap, self.degrees
+        neighbors = [j for j in self.neighbors[var] if j in heap]
+        for j in neighbors:
+            degrees[j] -= 1
+            heap.update(j, self.key(j))
+        return var, neighbors
+
+    def release(self, var, neighbors):
+        """Undo select(): the course is unassigned again."""
+        heap, degrees = self.heap, self.degrees
+        self.values[var] = -1
+        for j in neighbors:
+            degrees[j] += 1
+            heap.update(j, self.key(j))
+        heap.push(var, self.key(var))
+
+    def assign(self, var, slot, neighbors):
+        """
+        Give var slot position 'slot' and forward-check its unassigned neighbors.
+        :return: False if some neighbor is left without any slot
+        """
+        self.values[var] = slot
+        bit = 1 << slot
+        domains, sizes, heap, trail = self.domains, self.sizes, self.heap, self.trail
+        for j in neighbors:
+            old = domains[j]
+            if old & bit:
+                trail.append((j, old))
+                domains[j] = old ^ bit
+                sizes[j] -= 1
+                if not sizes[j]:
+                    return False
+                heap.update(j, self.key(j))
+        return True
+
+    def undo_to(self, mark):
+        domains, sizes, heap, trail = self.domains, self.sizes, self.heap, self.trail
+        for p in range(len(trail) - 1, mark - 1, -1):
+            j, old = trail[p]
+            domains[j] = old
+            sizes[j] = old.bit_count()
+            heap.update(j, self.key(j))
+        del trail[mark:]
+
+
+def _solve_component(courses, conflicts, time_slots, domains, method):
+    """Solve one component for solve_by_components."""
+    csp = ExamSchedulerCSP.from_conflicts(courses, conflicts, time_slots, domains)
+    return getattr(csp, method)()
+
+
+def _component_worker(results, index, job):
+    """Worker process for solve_by_components: put (index, assignment or None, error) on 'results'."""
+    try:
+        results.put((index, _solve_component(*job), None))
+    except Exception as error:
+        results.put((index, None, error))
+
+
+WORKER_POLL = 0.1                                   # seconds between two liveness checks
+
+
+def _wait_for_worker(results, running, deadline=None):
+    """
+    Wait for the next message of the worker processes in 'running' (dict key -> Process);
+    each worker puts one tuple starting with its key on 'results'.
+    A worker that exited without a message (killed, out of memory, SystemExit) counts as done.
+    :return: (key, message) with message None for a worker that died,
+             or None once 'deadline' (a time.perf_counter() value) has passed
+    """
+    exited = set()
+    while True:
+        wait = WORKER_POLL
+        if deadline is not None:
+            wait = min(wait, deadline - time.perf_counter())
+            if wait <= 0:
+                return None
+        try:
+            message = results.get(timeout=wait)
+            return message[0], message
+        except queue.Empty:
+            pass
+        for key, worker in running.items():
+            if worker.exitcode is not None:
+                if key in exited:
+                    return key, None
+                # its message may still be on the way; give it one more poll
+                exited.add(key)
+
+
+class SearchStats:
+    """
+    Opt-in search statistics for backtracking_search / backtracking_with_heuristics.
+    Attach with ExamSchedulerCSP.enable_stats(); counters accumulate over runs until reset().
+
+    on_node_enter(depth, assignment) and on_node_exit(depth, assignment, result) are
+    optional callbacks fired around every search node.
+    """
+    def __init__(self, on_node_enter=None, on_node_exit=None):
+        self.on_node_enter = on_node_enter
+        self.on_node_exit = on_node_exit
+        self.reset()
+
+    def reset(self):
+        self.nodes : int = 0
+        self.consistency_checks : int = 0
+        self.values_pruned : int = 0
+        self.backtracks : int = 0
+        self.max_depth : int = 0
+        # seconds spent per phase: "select", "consistency", "forward_check" and the whole "search"
+        self.phase_time : dict = defaultdict(float)
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "consistency_checks": self.consistency_checks,
+            "values_pruned": self.values_pruned,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "phase_time": dict(self.phase_time),
+        }
+
+    def __repr__(self):
+        return f"SearchStats({self.as_dict()})"
+
+
+class CancelToken:
+    """Cooperative cancellation for the budgeted solvers; cancel() may be called from any thread."""
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class SearchInterrupted(Exception):
+    """Raised inside the search when its budget runs out; 'status' says which budget."""
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class SearchResult:
+    """
+    Result of a solver run with a time/node budget or cancel token.
+    status: "solved", "infeasible", "timeout", "node_limit" or "cancelled"
+    assignment: the solution if solved, otherwise the deepest partial assignment reached
+    stats: nodes, backtracks, elapsed seconds (and SearchStats fields if enabled)
+    """
+    def __init__(self, status, assignment, stats):
+        self.status : str = status
+        self.assignment : dict = assignment
+        self.stats : dict = stats
+
+    @property
+    def solved(self):
+        return self.status == "solved"
+
+    def __repr__(self):
+        return f"SearchResult(status={self.status!r}, assigned={len(self.assignment)}, stats={self.stats})"
+
+
+class _SearchBudget:
+    """Node/time/cancel budget checked at every search node; keeps the deepest partial assignment."""
+    CLOCK_EVERY = 64                                # nodes between two clock reads
+
+    def __init__(self, time_limit=None, node_limit=None, cancel=None):
+        self.start = time.perf_counter()
+        self.deadline = None if time_limit is None else self.start + time_limit
+        self.node_limit = node_limit
+        self.cancel = cancel
+        self.nodes = 0
+        self.best = {}
+
+    def check(self, assignment):
+        self.nodes += 1
+        if len(assignment) > len(self.best):
+            self.best = dict(assignment)
+        if self.cancel is not None and self.cancel.cancelled:
+            raise SearchInterrupted("cancelled")
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchInterrupted("node_limit")
+        if self.deadline is not None and self.nodes % self.CLOCK_EVERY == 0 \
+                and time.perf_counter() > self.deadline:
+            raise SearchInterrupted("timeout")
+
+
+# (solver method, keyword arguments, shuffle seed) for portfolio_search.
+# A shuffle seed permutes course and slot order, which changes every tie-break of
+# the variable and value orderings without touching the solvers themselves.
+DEFAULT_PORTFOLIO = [
+    ("backtracking_with_bitsets", {}, None),
+    ("backtracking_with_mac", {}, None),
+    ("backtracking_with_cbj", {}, None),
+    ("solve_with_sat", {}, None),
+    ("backtracking_with_bitsets", {}, 1),
+    ("backtracking_with_mac", {}, 2),
+    ("min_conflicts", {"seed": 3}, None),
+]
+
+
+def _portfolio_worker(results, member, courses, conflicts, time_slots, domains, config):
+    """
+    Run one portfolio member and put (member, status, assignment) on 'results'.
+    status is "solved", "infeasible" (a complete solver proved there is no schedule)
+    or "unknown" (local search gave up, or the solver raised).
+    """
+    method, kwargs, seed = config
+    try:
+        if seed is not None:
+            rng = random.Random(seed)
+            courses = list(courses)
+            time_slots = list(time_slots)
+            rng.shuffle(courses)
+            rng.shuffle(time_slots)
+        csp = ExamSchedulerCSP.from_conflicts(courses, conflicts, time_slots, domains)
+        result = getattr(csp, method)(**kwargs)
+        if method == "min_conflicts":
+            assignment, violations = result
+            status = "solved" if violations == 0 else "unknown"
+            result = assignment if violations == 0 else None
+        else:
+            status = "solved" if result is not None else "infeasible"
+    except Exception:
+        status, result = "unknown", None
+    results.put((member, status, result))
+
 
 class ExamSchedulerCSP:
     def __init__(self, courses, students, time_slots):
@@ -21,11 +443,11 @@ class ExamSchedulerCSP:
         :param students: dict mapping student_id -> list of enrolled courses
         :param time_slots: list of available time slots (e.g., [1,2,3])
         """
-        self.courses : list = copy.deepcopy(courses)
+        self.courses : list = list(courses)
         self.students : dict = students
         self.time_slots : list = time_slots
         # TODO: create variables list
-        self.variables : list = copy.deepcopy(courses)
+        self.variables : list = list(courses)
         # TODO: initialize domains for each course (variable)
         self.domains : dict = self.build_domains()
 
@@ -33,6 +455,173 @@ class ExamSchedulerCSP:
         # conflicts should be a dict mapping course -> set(of conflicting courses)
         self.conflicts : dict = self.build_constraints()
 
+        # integer-indexed bitset view of domains/conflicts, built lazily by build_bitsets()
+        self.bitsets_ready : bool = False
+        # cached result of lower_bound() for bound_infeasible(); see infeasible_reason
+        self.greedy_bound = None
+        self.infeasible_reason = None
+
+        # CSR ConflictGraph with per-edge student counts, when built by from_graph()
+        self.graph = None
+        # shared-student count per conflicting pair, kept by the incremental update API,
+        # and the conflicting pairs no student explains (never removed by a drop)
+        self.pair_counts = None
+        self.pinned_pairs = None
+
+        # opt-in SearchStats, see enable_stats(); None keeps the solvers uninstrumented
+        self.stats = None
+
+        # work counters of the last solver run (read by benchmark.py);
+        # min_conflicts counts each move as a node and never backtracks
+        self.nodes_expanded : int = 0
+        self.backtracks : int = 0
+
+    @classmethod
+    def from_conflicts(cls, courses, conflicts, time_slots, domains=None):
+        """
+        Build a CSP straight from a conflict graph instead of student enrollments.
+        :param conflicts: dict course -> iterable of conflicting courses (edges to courses
+                          outside 'courses' are dropped)
+        :param domains: optional dict course -> list of allowed timeslots
+        """
+        csp = cls(courses, {}, time_slots)
+        course_set = set(courses)
+        csp.conflicts = {c: set(conflicts[c]) & course_set for c in courses}
+        if domains is not None:
+            csp.domains = {c: list(domains[c]) for c in courses}
+        return csp
+
+    @classmethod
+    def from_graph(cls, graph, time_slots):
+        """
+        Build a CSP from a ConflictGraph (see conflict_graph.py) without a students dict.
+        The bitset view is filled straight from the CSR arrays.
+        """
+        csp = cls.from_conflicts(graph.names, graph.to_conflicts(), time_slots)
+        csp.graph = graph
+
+        full = (1 << len(csp.time_slots)) - 1
+        csp.index = dict(graph.ids)
+        csp.domain_masks = [full] * len(graph)
+        csp.neighbor_lists = []
+        csp.neighbor_masks = []
+        for i in range(len(graph)):
+            neighbors = graph.neighbors(i).tolist()
+            mask = 0
+            for j in neighbors:
+                mask |= 1 << j
+            csp.neighbor_lists.append(neighbors)
+            csp.neighbor_masks.append(mask)
+        csp.bitsets_ready = True
+        return csp
+
+    def enable_stats(self, on_node_enter=None, on_node_exit=None):
+        """Turn on SearchStats for the next solver runs and return the stats object."""
+        self.stats = SearchStats(on_node_enter, on_node_exit)
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    def _run_instrumented(self, entry, *args, budget=None):
+        """
+        Call the search method named 'entry'.
+        With stats enabled or a budget given, timing/counting/budget wrappers are installed
+        as instance attributes that shadow the methods for this run only, so a plain run
+        executes the undecorated methods with no extra checks at all.
+        """
+        stats = self.stats
+        if stats is None and budget is None:
+            return getattr(self, entry)(*args)
+
+        perf = time.perf_counter
+        wrappers = {}
+
+        if stats is not None:
+            is_consistent = self.is_consistent
+            forward_check = self.forward_check
+            select = self.select_unassigned_variable
+
+            def timed_is_consistent(assignment, course, value):
+                start = perf()
+                result = is_consistent(assignment, course, value)
+                stats.phase_time["consistency"] += perf() - start
+                stats.consistency_checks += 1
+                return result
+
+            def timed_forward_check(var, value, assignment, local_domains):
+                start = perf()
+                status, record_list = forward_check(var, value, assignment, local_domains)
+                stats.phase_time["forward_check"] += perf() - start
+                stats.values_pruned += len(record_list)
+                return status, record_list
+
+            def timed_select(assignment, local_domains):
+                start = perf()
+                var = select(assignment, local_domains)
+                stats.phase_time["select"] += perf() - start
+                return var
+
+            wrappers["is_consistent"] = timed_is_consistent
+            wrappers["forward_check"] = timed_forward_check
+            wrappers["select_unassigned_variable"] = timed_select
+
+        def traced_node(node):
+            def visit(assignment, *rest):
+                if budget is not None:
+                    budget.check(assignment)
+                if stats is None:
+                    return node(assignment, *rest)
+                depth = len(assignment)
+                stats.nodes += 1
+                if depth > stats.max_depth:
+                    stats.max_depth = depth
+                if stats.on_node_enter is not None:
+                    stats.on_node_enter(depth, assignment)
+                result = node(assignment, *rest)
+                if stats.on_node_exit is not None:
+                    stats.on_node_exit(depth, assignment, result)
+                return result
+            return visit
+
+        wrappers["_backtrack"] = traced_node(self._backtrack)
+        wrappers["_backtrack_heuristic"] = traced_node(self._backtrack_heuristic)
+        self.__dict__.update(wrappers)
+        start = perf()
+        try:
+            return getattr(self, entry)(*args)
+        finally:
+            if stats is not None:
+                stats.phase_time["search"] += perf() - start
+                stats.backtracks += self.backtracks
+            for name in wrappers:
+                del self.__dict__[name]
+
+    def _run_budgeted(self, entry, *args, time_limit=None, node_limit=None, cancel=None):
+        """Run search 'entry' under a budget and wrap the outcome in a SearchResult."""
+        budget = _SearchBudget(time_limit, node_limit, cancel)
+        if self.bound_infeasible():
+            status, assignment = "infeasible", {}
+        else:
+            try:
+                assignment = self._run_instrumented(entry, *args, budget=budget)
+                status = "infeasible" if assignment is None else "solved"
+                if assignment is None:
+                    assignment = budget.best
+                else:
+                    assignment = dict(assignment)
+            except SearchInterrupted as interrupt:
+                status, assignment = interrupt.status, budget.best
+        stats = {"nodes": self.nodes_expanded, "backtracks": self.backtracks,
+                 "elapsed": time.perf_counter() - budget.start}
+        if self.stats is not None:
+            stats.update(self.stats.as_dict())
+        return SearchResult(status, assignment, stats)
+
+    def reset_counters(self):
+        self.nodes_expanded = 0
+        self.backtracks = 0
+
     def build_domains(self):
 
         domains = dict()
@@ -51,12 +640,11 @@ class ExamSchedulerCSP:
         for course in self.courses:
             conflict[course] = set()
         
+        # each unordered pair of a student's courses once
         for courses in self.students.values():
-            for course in courses:
-                for course_2 in courses:
-                    if course_2 != course:
-                        conflict[course].add(course_2)
-                
+            for course, course_2 in combinations(set(courses), 2):
+                conflict[course].add(course_2)
+                conflict[course_2].add(course)
 
         # TODO: implement and return a dict mapping course -> set(conflicting_courses)
         return conflict
@@ -80,11 +668,23 @@ class ExamSchedulerCSP:
     # -------------------------
     # Plain Backtracking solver
     # -------------------------
-    def backtracking_search(self):
-        """Run plain backtracking on this CSP and return an assignment or None."""
-        return self._backtrack({})
+    def backtracking_search(self, time_limit=None, node_limit=None, cancel=None):
+        """
+        Run plain backtracking on this CSP and return an assignment or None.
+        If time_limit (seconds), node_limit or a CancelToken is given, the run stops when the
+        budget is spent and a SearchResult (status, best partial assignment, stats) is
+        returned instead.
+        """
+        self.reset_counters()
+        if time_limit is not None or node_limit is not None or cancel is not None:
+            return self._run_budgeted("_backtrack", {}, time_limit=time_limit,
+                                      node_limit=node_limit, cancel=cancel)
+        if self.bound_infeasible():
+            return None
+        return self._run_instrumented("_backtrack", {})
 
     def _backtrack(self, assignment):
+        self.nodes_expanded += 1
         # TODO: if assignment is complete return assignment
         if len(assignment) == len(self.courses):
             return assignment
@@ -108,6 +708,7 @@ class ExamSchedulerCSP:
                     return result
                 
                 assignment.pop(var)
+                self.backtracks += 1
 
 
         return None
@@ -172,13 +773,23 @@ class ExamSchedulerCSP:
                         return False,record_list
         return True, record_list
 
-    def backtracking_with_heuristics(self):
-        """Wrapper to run backtracking with MRV + Degree + Forward Checking"""
+    def backtracking_with_heuristics(self, time_limit=None, node_limit=None, cancel=None):
+        """
+        Wrapper to run backtracking with MRV + Degree + Forward Checking.
+        Takes the same optional budget as backtracking_search and then returns a SearchResult.
+        """
         # prepare a copy of domains for local manipulation
         local_domains = {v: list(self.domains[v]) for v in self.courses}
-        return self._backtrack_heuristic({}, local_domains)
+        self.reset_counters()
+        if time_limit is not None or node_limit is not None or cancel is not None:
+            return self._run_budgeted("_backtrack_heuristic", {}, local_domains,
+                                      time_limit=time_limit, node_limit=node_limit, cancel=cancel)
+        if self.bound_infeasible():
+            return None
+        return self._run_instrumented("_backtrack_heuristic", {}, local_domains)
 
     def _backtrack_heuristic(self, assignment : dict, local_domains):
+        self.nodes_expanded += 1
         # TODO: if assignment complete → return assignment
         if len(assignment) == len(self.courses):
             return assignment
@@ -192,6 +803,7 @@ class ExamSchedulerCSP:
                 status,record_list = self.forward_check(var,value,assignment,local_domains)
                 if not status:
                     assignment.pop(var)
+                    self.backtracks += 1
                     for var_2,value_2 in record_list:
                             local_domains[var_2].append(value_2)
                 else:
@@ -200,6 +812,7 @@ class ExamSchedulerCSP:
                         return result
                     
                     assignment.pop(var)
+                    self.backtracks += 1
                     for var_2,value_2 in record_list:
                             local_domains[var_2].append(value_2)
         # For each value:
@@ -209,7 +822,1562 @@ class ExamSchedulerCSP:
         #   - restore domains from removed list if recursion fails
         #   - unassign variable and continue
 
+    # ------------------------------------------------
+    # Bitset representation (integer-indexed courses)
+    # ------------------------------------------------
+    def build_bitsets(self):
+        """
+        Map every course to an integer index and store domains and conflicts as int bitmasks.
+        Bit s of a domain mask stands for self.time_slots[s],
+        bit j of a neighbor mask stands for self.courses[j].
+        """
+        self.index : dict = {course: i for i, course in enumerate(self.courses)}
+        slot_index = {slot: s for s, slot in enumerate(self.time_slots)}
+
+        self.domain_masks : list = []
+        for course in self.courses:
+            mask = 0
+            for slot in self.domains[course]:
+                mask |= 1 << slot_index[slot]
+            self.domain_masks.append(mask)
+
+        self.neighbor_lists : list = []
+        self.neighbor_masks : list = []
+        for course in self.courses:
+            neighbors = sorted(self.index[c] for c in self.conflicts[course])
+            mask = 0
+            for j in neighbors:
+                mask |= 1 << j
+            self.neighbor_lists.append(neighbors)
+            self.neighbor_masks.append(mask)
+
+        self.bitsets_ready = True
+        self.greedy_bound = None
+
+    def _ensure_bitsets(self):
+        if not self.bitsets_ready:
+            self.build_bitsets()
+
+    def decode_assignment(self, values):
+        """Convert a list course index -> slot position back to a dict course -> timeslot."""
+        return {self.courses[i]: self.time_slots[s] for i, s in enumerate(values) if s >= 0}
+
+    def backtracking_with_bitsets(self):
+        """
+        MRV + Degree + Forward Checking on the bitset representation.
+        Same search as backtracking_with_heuristics, but pruning a value from a neighbor
+        and undoing it are single bitwise ops on an int mask, and MRV reads the smallest
+        non-empty domain-size bucket instead of scanning every course.
+        """
+        self._ensure_bitsets()
+        n = len(self.courses)
+        domains = list(self.domain_masks)
+        sizes = [mask.bit_count() for mask in domains]
+        degrees = [len(neighbors) for neighbors in self.neighbor_lists]
+        values = [-1] * n
+
+        # size_buckets[d] = bitmask of unassigned courses whose domain holds d values
+        size_buckets = [0] * (len(self.time_slots) + 1)
+        for i, size in enumerate(sizes):
+            size_buckets[size] |= 1 << i
+        if n and size_buckets[0]:
+            return None
+
+        state = (domains, sizes, degrees, values, size_buckets)
+        self.reset_counters()
+        if self.bound_infeasible():
+            return None
+        # one frame per course
+        with _recursion_limit(n):
+            solved = self._backtrack_bitset(state, n)
+        if solved:
+            return self.decode_assignment(values)
+        return None
+
+    def _select_bitset_variable(self, size_buckets, degrees):
+        # MRV: first non-empty size bucket, ties broken by the number of unassigned neighbors
+        for bucket in size_buckets:
+            if bucket:
+                break
+        best = -1
+        best_degree = -1
+        while bucket:
+            low = bucket & -bucket
+            bucket ^= low
+            i = low.bit_length() - 1
+            if degrees[i] > best_degree:
+                best, best_degree = i, degrees[i]
+        return best
+
+    def _backtrack_bitset(self, state, remaining_vars):
+        self.nodes_expanded += 1
+        if not remaining_vars:
+            return True
+
+        domains, sizes, degrees, values, size_buckets = state
+        var = self._select_bitset_variable(size_buckets, degrees)
+        var_bit = 1 << var
+        size_buckets[sizes[var]] ^= var_bit
+        neighbors = [j for j in self.neighbor_lists[var] if values[j] < 0]
+        for j in neighbors:
+            degrees[j] -= 1
+
+        remaining = domains[var]
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+
+            # every value left in a forward-checked domain is already consistent
+            values[var] = bit.bit_length() - 1
+            pruned = []
+            ok = True
+            for j in neighbors:
+                if domains[j] & bit:
+                    domains[j] ^= bit
+                    size = sizes[j]
+                    j_bit = 1 << j
+                    size_buckets[size] ^= j_bit
+                    size_buckets[size - 1] |= j_bit
+                    sizes[j] = size - 1
+                    pruned.append(j)
+                    if size == 1:
+                        ok = False
+                        break
+
+            if ok and self._backtrack_bitset(state, remaining_vars - 1):
+                return True
+            self.backtracks += 1
+
+            for j in pruned:
+                domains[j] |= bit
+                size = sizes[j]
+                j_bit = 1 << j
+                size_buckets[size] ^= j_bit
+                size_buckets[size + 1] |= j_bit
+                sizes[j] = size + 1
+
+        values[var] = -1
+        for j in neighbors:
+            degrees[j] += 1
+        size_buckets[sizes[var]] |= var_bit
+        return False
+
+    # ------------------------------------------------------
+    # Iterative backtracking: explicit stack + shared trail
+    # ------------------------------------------------------
+    def backtracking_iterative(self, symmetry_breaking=False, value_order="lowest"):
+        """
+        MRV + Degree + Forward Checking without recursion.
+        Decisions live on an explicit stack of [course, values left to try, trail mark,
+        unassigned neighbors], and every domain change goes on one shared trail of
+        (course index, old mask) that is undone by truncating it back to the mark,
+        so there is no recursion limit and no per-value bookkeeping list.
+        The state is a SearchCore: names are mapped to ints once, and the next course is
+        popped from its indexed MRV heap, so a decision costs O(deg * log n) instead of
+        an O(n) scan over every course.
+
+        With forward checking and identical domains a course's domain size is the number of
+        slots minus its saturation (distinct slots among scheduled neighbors), so the MRV
+        order is DSATUR order with the uncolored degree as tie-breaker.
+
+        :param symmetry_breaking: slots are interchangeable, so try at most one slot nobody
+                                  uses yet per decision (needs identical domains)
+        :param value_order: "lowest" (slot order) or "lcv" (least constraining value first:
+                            fewest unassigned neighbors that still have the slot)
+        """
+        return next(self.iter_solutions(symmetry_breaking, value_order), None)
+
+    def iter_solutions(self, symmetry_breaking=False, value_order="lowest"):
+        """
+        Lazily yield every valid schedule, one dict course -> timeslot at a time.
+        Same engine as backtracking_iterative, which just takes the first one: after a
+        solution is yielded the search resumes from the last decision, so only the
+        current path is held in memory.
+
+        > for assignment in itertools.islice(csp.iter_solutions(), 10): ...
+
+        :param symmetry_breaking: yield one schedule per relabeling of the slots
+                                  (every other schedule is a permutation of a yielded one)
+        :param value_order: "lowest" or "lcv", see backtracking_iterative
+        """
+        self._ensure_bitsets()
+        if value_order not in ("lowest", "lcv"):
+            raise ValueError(f"unknown value_order {value_order!r}")
+        if symmetry_breaking and len(set(self.domain_masks)) > 1:
+            raise ValueError("symmetry breaking needs identical domains for all courses")
+        return self._iterate_solutions(symmetry_breaking, value_order)
+
+    def _iterate_solutions(self, symmetry_breaking, value_order):
+        n = len(self.courses)
+        self.reset_counters()
+        if self.bound_infeasible():
+            return
+        if n == 0:
+            yield {}
+            return
+        core = SearchCore(self.domain_masks, self.neighbor_lists)
+        if 0 in core.sizes:
+            return
+
+        domains = core.domains
+        values = core.values
+        stack = []
+        # courses per slot position; a slot with count 0 is still "fresh"
+        slot_use = [0] * len(self.time_slots)
+        used = 0
+
+        def candidate_values(var, neighbors):
+            # slot positions to try for var, in reverse order (popped from the end)
+            mask = domains[var]
+            if symmetry_breaking:
+                fresh = mask & ~used
+                if fresh:
+                    mask = (mask & used) | (fresh & -fresh)
+            slots = list(self._iter_bits(mask))
+            if value_order == "lcv" and len(slots) > 1:
+                # neighbor counts per value, computed once per decision
+                pruned = {slot: 0 for slot in slots}
+                for j in neighbors:
+                    for slot in self._iter_bits(domains[j] & mask):
+                        pruned[slot] += 1
+                slots.sort(key=lambda slot: (pruned[slot], slot))
+            slots.reverse()
+            return slots
+
+        def push_decision():
+            var, neighbors = core.select()
+            stack.append([var, candidate_values(var, neighbors), len(core.trail), neighbors])
+            self.nodes_expanded += 1
+
+        push_decision()
+        while stack:
+            var, remaining, mark, neighbors = stack[-1]
+            core.undo_to(mark)
+            if values[var] >= 0:
+                # release the slot tried last time
+                slot = values[var]
+                values[var] = -1
+                slot_use[slot] -= 1
+                if not slot_use[slot]:
+                    used ^= 1 << slot
+
+            if not remaining:
+                # every value of var failed: give the course back and retry the previous decision
+                stack.pop()
+                core.release(var, neighbors)
+                if stack:
+                    self.backtracks += 1
+                continue
+
+            slot = remaining.pop()
+            slot_use[slot] += 1
+            used |= 1 << slot
+            if not core.assign(var, slot, neighbors):
+                self.backtracks += 1
+                continue
+
+            if len(stack) == n:
+                # the next pass undoes this value and tries the course's next one
+                yield self.decode_assignment(values)
+                continue
+            push_decision()
+
+    # ------------------------------------------------------
+    # Solution counting: dynamic components + caching
+    # ------------------------------------------------------
+    def count_solutions(self, max_cache=1000000):
+        """
+        Count every valid schedule without enumerating them one by one.
+        - The conflict graph is split into connected components whose counts multiply.
+        - After each decision the unscheduled courses of the component are split again,
+          since scheduling a course can disconnect what is left.
+        - Counts are cached by (unscheduled courses, domains that were pruned), so a residual
+          sub-problem reached through different decisions is only counted once.
+
+        :param max_cache: stop adding cache entries past this many
+        :return: number of solutions (an int, may be very large)
+        """
+        self._ensure_bitsets()
+        n = len(self.courses)
+        neighbor_lists = self.neighbor_lists
+        domains = list(self.domain_masks)
+        # courses whose domain lost values on the current path, and how many times
+        prune_counts = [0] * n
+        reduced = 0
+        cache = {}
+        self.reset_counters()
+        if self.bound_infeasible():
+            return 0
+
+        def split(free):
+            # connected components (as bitmasks) of the conflict graph restricted to 'free'
+            components = []
+            while free:
+                low = free & -free
+                free ^= low
+                component = low
+                members = [low.bit_length() - 1]
+                for i in members:
+                    for j in neighbor_lists[i]:
+                        if free >> j & 1:
+                            free ^= 1 << j
+                            component |= 1 << j
+                            members.append(j)
+                components.append(component)
+            return components
+
+        def count(free):
+            nonlocal reduced
+            if not free & (free - 1):
+                return domains[free.bit_length() - 1].bit_count()
+            # only pruned domains can differ from the start, so they and 'free' fix the state
+            boundary = reduced & free
+            key = (free, boundary, tuple(domains[j] for j in self._iter_bits(boundary)))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            self.nodes_expanded += 1
+
+            # MRV among pruned courses (ties by degree); an untouched component starts at
+            # its highest-degree course
+            candidates = self._iter_bits(boundary if boundary else free)
+            var = min(candidates, key=lambda i: (domains[i].bit_count(), -len(neighbor_lists[i])))
+            rest = free ^ (1 << var)
+            neighbors = [j for j in neighbor_lists[var] if rest >> j & 1]
+
+            total = 0
+            remaining = domains[var]
+            while remaining:
+                bit = remaining & -remaining
+                remaining ^= bit
+                pruned = []
+                product = 0
+                for j in neighbors:
+                    if domains[j] & bit:
+                        domains[j] ^= bit
+                        prune_counts[j] += 1
+                        reduced |= 1 << j
+                        pruned.append(j)
+                        if not domains[j]:
+                            break
+                else:
+                    # dropping a course with a single neighbor cannot disconnect the rest
+                    product = 1
+                    for component in split(rest) if len(neighbors) > 1 else [rest]:
+                        product *= count(component)
+                        if not product:
+                            break
+                if not product:
+                    self.backtracks += 1
+                total += product
+                for j in pruned:
+                    domains[j] |= bit
+                    prune_counts[j] -= 1
+                    if not prune_counts[j]:
+                        reduced ^= 1 << j
+
+            if len(cache) < max_cache:
+                cache[key] = total
+            return total
+
+        total = 1
+        # one frame per decision at most
+        with _recursion_limit(n):
+            for component in split((1 << n) - 1):
+                total *= count(component)
+                if not total:
+                    break
+        return total
+
+    # ------------------------------------------------
+    # Incremental updates + local schedule repair
+    # ------------------------------------------------
+    def _ensure_pair_counts(self):
+        # shared-student count per conflicting pair; edges that no student explains
+        # (e.g. from from_conflicts) go to pinned_pairs and are never removed by a drop
+        if self.pair_counts is not None:
+            return
+        counts = defaultdict(int)
+        if self.graph is not None:
+            graph = self.graph
+            for i, name in enumerate(graph.names):
+                for j, weight in zip(graph.neighbors(i), graph.edge_weights(i)):
+                    if i < j:
+                        counts[frozenset((name, graph.names[j]))] = weight
+        else:
+            for courses in self.students.values():
+                for a, b in combinations(set(courses), 2):
+                    counts[frozenset((a, b))] += 1
+        self.pair_counts = counts
+        self.pinned_pairs = {frozenset((a, b)) for a in self.courses for b in self.conflicts[a]
+                             if frozenset((a, b)) not in counts}
+
+    def _invalidate_caches(self):
+        # the conflict graph changed: rebuild the bitset view and bounds on next use
+        self.bitsets_ready = False
+        self.greedy_bound = None
+        self.infeasible_reason = None
+
+    def add_course(self, course, domain=None):
+        """Add a course with no enrollments (domain defaults to all time slots)."""
+        if course in self.conflicts:
+            return
+        self._ensure_pair_counts()
+        self.courses.append(course)
+        self.variables.append(course)
+        self.domains[course] = list(self.time_slots if domain is None else domain)
+        self.conflicts[course] = set()
+        self._invalidate_caches()
+
+    def remove_course(self, course):
+        """Remove a course, its enrollments and all its conflicts."""
+        if course not in self.conflicts:
+            return
+        self._ensure_pair_counts()
+        for student, courses in self.students.items():
+            if course in courses:
+                self.drop_enrollment(student, course)
+        for neighbor in self.conflicts.pop(course):
+            self.conflicts[neighbor].discard(course)
+            self.pair_counts.pop(frozenset((course, neighbor)), None)
+            self.pinned_pairs.discard(frozenset((course, neighbor)))
+        self.courses.remove(course)
+        self.variables.remove(course)
+        del self.domains[course]
+        self._invalidate_caches()
+
+    def add_enrollment(self, student, course):
+        """Enroll 'student' in 'course' (created if unknown) and add the new conflicts."""
+        self._ensure_pair_counts()
+        if course not in self.conflicts:
+            self.add_course(course)
+        courses = self.students.setdefault(student, [])
+        if course in courses:
+            return
+        for other in set(courses):
+            key = frozenset((course, other))
+            self.pair_counts[key] += 1
+            self.conflicts[course].add(other)
+            self.conflicts[other].add(course)
+        courses.append(course)
+        self._invalidate_caches()
+
+    def drop_enrollment(self, student, course):
+        """Remove 'student' from 'course'; a conflict disappears when no student shares it any more."""
+        self._ensure_pair_counts()
+        courses = self.students.get(student)
+        if not courses or course not in courses:
+            return
+        courses.remove(course)
+        for other in set(courses):
+            key = frozenset((course, other))
+            if key not in self.pair_counts:
+                continue
+            self.pair_counts[key] -= 1
+            if self.pair_counts[key] <= 0:
+                del self.pair_counts[key]
+                if key in self.pinned_pairs:
+                    continue
+                self.conflicts[course].discard(other)
+                self.conflicts[other].discard(course)
+        self._invalidate_caches()
+
+    def repair(self, assignment, method="backtracking_iterative"):
+        """
+        Fix a previous schedule after the conflict graph changed, moving as few courses as possible.
+        1. keep every course whose slot is still allowed; new courses start unscheduled
+        2. unschedule one course per violated conflict (the one in the most violations)
+        3. give each unscheduled course a slot its neighbors leave free, if there is one
+        4. otherwise re-solve only the unscheduled courses with their neighbors' slots fixed,
+           widening the region by one ring of neighbors each time that fails
+
+        :param assignment: old dict course -> timeslot
+        :return: repaired assignment (self.repair_changes lists the courses that moved or
+                 were added), or None if no schedule exists at all
+        """
+        schedule = {c: assignment[c] for c in self.courses
+                    if c in assignment and assignment[c] in self.domains[c]}
+
+        violations = defaultdict(int)
+        for course in schedule:
+            for neighbor in self.conflicts[course]:
+                if schedule.get(neighbor) == schedule[course]:
+                    violations[course] += 1
+        for course in sorted(violations, key=lambda c: -violations[c]):
+            if course in schedule and any(schedule.get(nb) == schedule[course]
+                                          for nb in self.conflicts[course]):
+                del schedule[course]
+
+        free = [c for c in self.courses if c not in schedule]
+        stuck = []
+        for course in free:
+            used = {schedule[nb] for nb in self.conflicts[course] if nb in schedule}
+            slot = next((s for s in self.domains[course] if s not in used), None)
+            if slot is None:
+                stuck.append(course)
+            else:
+                schedule[course] = slot
+
+        region = set(stuck)
+        while region:
+            for course in region:
+                schedule.pop(course, None)
+            domains = {}
+            for course in region:
+                used = {schedule[nb] for nb in self.conflicts[course] if nb in schedule}
+                domains[course] = [s for s in self.domains[course] if s not in used]
+            members = [c for c in self.courses if c in region]
+            sub = ExamSchedulerCSP.from_conflicts(members, self.conflicts, self.time_slots, domains)
+            result = getattr(sub, method)()
+            if result is not None:
+                schedule.update(result)
+                break
+            wider = region | {nb for c in region for nb in self.conflicts[c]}
+            if len(wider) == len(region):
+                return None                         # region is a union of components: no schedule
+            region = wider
+
+        self.repair_changes = [c for c in self.courses
+                               if c not in assignment or assignment[c] != schedule[c]]
+        return schedule
+
+    # ----------------------------------------------
+    # AC-3 preprocessing + MAC (maintaining arc consistency)
+    # ----------------------------------------------
+    def ac3(self):
+        """
+        Run AC-3 over the whole conflict graph.
+        :return: (success, domains) where domains is a list course index -> pruned domain mask.
+                 success is False if some domain was wiped out.
+        """
+        self._ensure_bitsets()
+        domains = list(self.domain_masks)
+        ok = self._propagate(domains, list(range(len(domains))), [])
+        return ok, domains
+
+    def _propagate(self, domains, queue, trail):
+        """
+        AC-3 for "not equal" constraints.
+        An arc (j -> i) can only remove a value from j when domain i is a singleton,
+        so the queue holds courses whose domain changed and each one is revised
+        against all its neighbors at once.
+        Every changed domain is pushed on the trail as (course index, old mask).
+        :return: False if a domain becomes empty.
+        """
+        neighbor_lists = self.neighbor_lists
+        queued = set(queue)
+        queue = list(queue)
+        while queue:
+            i = queue.pop()
+            queued.discard(i)
+            mask = domains[i]
+            if mask & (mask - 1):
+                continue                            # two or more values: supports every neighbor
+            for j in neighbor_lists[i]:
+                old = domains[j]
+                if old & mask:
+                    trail.append((j, old))
+                    domains[j] = old ^ mask
+                    if not domains[j]:
+                        return False
+                    if j not in queued:
+                        queued.add(j)
+                        queue.append(j)
+        return True
+
+    @staticmethod
+    def _undo_trail(domains, trail, mark):
+        """Restore every domain changed after trail position 'mark'."""
+        while len(trail) > mark:
+            i, mask = trail.pop()
+            domains[i] = mask
+
+    def backtracking_with_mac(self):
+        """
+        AC-3 as a preprocessing pass, then backtracking with MRV + Degree that
+        re-establishes arc consistency after every assignment and every refuted value.
+        Domain changes are recorded on one trail and undone by popping it back to a mark.
+        """
+        self.reset_counters()
+        if self.bound_infeasible():
+            return None
+        ok, domains = self.ac3()
+        if not ok:
+            return None
+        n = len(self.courses)
+        values = [-1] * n
+
+        with _recursion_limit(n):
+            solved = self._backtrack_mac(domains, values, (1 << n) - 1, [])
+        if solved:
+            return self.decode_assignment(values)
+        return None
+
+    def _select_mac_variable(self, domains, values, unassigned):
+        best = -1
+        best_size = 1 << 30
+        best_degree = -1
+        neighbor_masks = self.neighbor_masks
+        for i, value in enumerate(values):
+            if value >= 0:
+                continue
+            size = domains[i].bit_count()
+            if size > best_size:
+                continue
+            degree = (neighbor_masks[i] & unassigned).bit_count()
+            if size < best_size or degree > best_degree:
+                best, best_size, best_degree = i, size, degree
+        return best
+
+    def _backtrack_mac(self, domains, values, unassigned, trail):
+        self.nodes_expanded += 1
+        if not unassigned:
+            return True
+
+        var = self._select_mac_variable(domains, values, unassigned)
+        unassigned ^= 1 << var
+        outer_mark = len(trail)
+
+        while domains[var]:
+            bit = domains[var] & -domains[var]
+            mark = len(trail)
+
+            values[var] = bit.bit_length() - 1
+            trail.append((var, domains[var]))
+            domains[var] = bit
+            if self._propagate(domains, [var], trail) and \
+                    self._backtrack_mac(domains, values, unassigned, trail):
+                return True
+            self._undo_trail(domains, trail, mark)
+            self.backtracks += 1
+
+            # refute the value: var != bit, and propagate that as well
+            trail.append((var, domains[var]))
+            domains[var] ^= bit
+            if not domains[var] or not self._propagate(domains, [var], trail):
+                break
+
+        values[var] = -1
+        self._undo_trail(domains, trail, outer_mark)
+        return False
+
+    # ----------------------------------------------------
+    # Conflict-directed backjumping (CBJ) + nogood learning
+    # ----------------------------------------------------
+    def backtracking_with_cbj(self, max_nogoods=10000, max_nogood_size=8):
+        """
+        Backtracking over a static max-degree order that keeps a conflict set per course.
+        When a course runs out of values the search jumps straight back to the deepest
+        course in its conflict set instead of the previous one, and the assignment of that
+        conflict set is learned as a nogood.
+        :param max_nogoods: capacity of the nogood store (oldest nogoods are evicted first)
+        :param max_nogood_size: nogoods with more pairs than this are not stored
+        """
+        self._ensure_bitsets()
+        n = len(self.courses)
+        order = sorted(range(n), key=lambda i: -len(self.neighbor_lists[i]))
+        position = [0] * n
+        for depth, i in enumerate(order):
+            position[i] = depth
+
+        self.nogoods = NogoodStore(max_nogoods, max_nogood_size)
+        values = [-1] * n
+        slot_members = [0] * len(self.time_slots)
+
+        state = (order, position, values, slot_members)
+        self.reset_counters()
+        if self.bound_infeasible():
+            return None
+        with _recursion_limit(n):
+            solved, _ = self._backtrack_cbj(state, 0)
+        if solved:
+            return self.decode_assignment(values)
+        return None
+
+    def _backtrack_cbj(self, state, depth):
+        """:return: (solved, conflict set of this course as a bitmask of course indices)"""
+        self.nodes_expanded += 1
+        order, position, values, slot_members = state
+        if depth == len(order):
+            return True, 0
+
+        var = order[depth]
+        var_bit = 1 << var
+        neighbor_mask = self.neighbor_masks[var]
+        conflict_set = 0
+
+        remaining = self.domain_masks[var]
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            slot = bit.bit_length() - 1
+
+            clash = neighbor_mask & slot_members[slot]
+            if clash:
+                # any one clashing course explains the failure; the earliest one lets CBJ jump furthest
+                earliest = min(self._iter_bits(clash), key=position.__getitem__)
+                conflict_set |= 1 << earliest
+                continue
+            violated, culprit = self.nogoods.violated((var, slot), values)
+            if violated:
+                conflict_set |= culprit
+                continue
+
+            values[var] = slot
+            slot_members[slot] |= var_bit
+            solved, child_conflicts = self._backtrack_cbj(state, depth + 1)
+            if solved:
+                return True, 0
+            values[var] = -1
+            slot_members[slot] ^= var_bit
+            self.backtracks += 1
+
+            if not child_conflicts & var_bit:
+                # this course is not to blame for the failure below: jump over it
+                return False, child_conflicts
+            conflict_set |= child_conflicts ^ var_bit
+
+        if conflict_set:
+            deepest = max(self._iter_bits(conflict_set), key=position.__getitem__)
+            rest = tuple((i, values[i]) for i in self._iter_bits(conflict_set ^ (1 << deepest)))
+            self.nogoods.learn((deepest, values[deepest]), rest)
+        return False, conflict_set
+
+    @staticmethod
+    def _iter_bits(mask):
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            yield low.bit_length() - 1
+
+    # ----------------------------------------------------
+    # SAT backend: CNF encoding + built-in CDCL solver
+    # ----------------------------------------------------
+    def encode_sat(self, symmetry_breaking=True, deadline=None, cancel=None):
+        """
+        Encode the CSP as CNF on a fresh SATSolver (see sat_solver.py).
+        Variable x(i, s) means course i sits in slot position s; clauses are
+        - at least one slot per course: x(i, s1) or x(i, s2) or ...
+        - at most one slot per course: not x(i, s) or not x(i, t) for every pair s < t
+        - one clause per conflict and shared slot: not x(i, s) or not x(j, s)
+
+        :param symmetry_breaking: with identical domains, pin the courses of a greedy
+                                  conflict clique to the first slots (slots are interchangeable)
+        :param deadline: time.perf_counter() value after which encoding stops
+        :param cancel: CancelToken checked while encoding
+        :return: (solver, slot_vars) with slot_vars[i] = {slot position: SAT variable}
+        :raises SearchInterrupted: "timeout" or "cancelled" if the encoding was stopped
+        """
+        self._ensure_bitsets()
+        solver = SATSolver()
+        slot_vars = []
+        for mask in self.domain_masks:
+            slot_vars.append({s: solver.new_var() for s in self._iter_bits(mask)})
+
+        def check():
+            # large instances take seconds to encode, so the budget covers this part too
+            if cancel is not None and cancel.cancelled:
+                raise SearchInterrupted("cancelled")
+            if deadline is not None and time.perf_counter() > deadline:
+                raise SearchInterrupted("timeout")
+
+        for slots in slot_vars:
+            check()
+            solver.add_clause(list(slots.values()))
+            for a, b in combinations(slots.values(), 2):
+                solver.add_clause([-a, -b])
+        for i, neighbors in enumerate(self.neighbor_lists):
+            check()
+            for j in neighbors:
+                if j < i:
+                    continue
+                for s in self._iter_bits(self.domain_masks[i] & self.domain_masks[j]):
+                    solver.add_clause([-slot_vars[i][s], -slot_vars[j][s]])
+
+        if symmetry_breaking and len(set(self.domain_masks)) == 1:
+            # the k-th clique course takes the k-th slot of the shared domain
+            shared = list(self._iter_bits(self.domain_masks[0]))
+            for s, i in zip(shared, self.greedy_clique()):
+                solver.add_clause([slot_vars[i][s]])
+        return solver, slot_vars
+
+    def solve_with_sat(self, symmetry_breaking=True, time_limit=None, node_limit=None, cancel=None):
+        """
+        Solve through encode_sat() and the CDCL solver: clause learning, non-chronological
+        backjumping and restarts, with no external SAT binary.
+        Counters: nodes_expanded = decisions, backtracks = conflicts.
+
+        With time_limit, node_limit (max conflicts) or a CancelToken a SearchResult is
+        returned, like backtracking_search. The time limit and cancel token also cover
+        building the CNF.
+        """
+        budgeted = time_limit is not None or node_limit is not None or cancel is not None
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        self.reset_counters()
+        solver = None
+        assignment = None
+        if self.bound_infeasible():
+            status = "infeasible"
+        else:
+            try:
+                solver, slot_vars = self.encode_sat(symmetry_breaking, deadline, cancel)
+            except SearchInterrupted as stop:
+                status = stop.status
+        if solver is not None:
+            interrupt = None if cancel is None else (lambda: cancel.cancelled)
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            outcome = solver.solve(conflict_limit=node_limit, time_limit=remaining,
+                                   interrupt=interrupt)
+            self.nodes_expanded = solver.decisions
+            self.backtracks = solver.conflicts
+            if outcome:
+                values = [-1] * len(self.courses)
+                for i, slots in enumerate(slot_vars):
+                    values[i] = next(s for s, x in slots.items() if solver.value(x))
+                assignment = self.decode_assignment(values)
+                status = "solved"
+            elif outcome is None:
+                status = {"conflict_limit": "node_limit", "timeout": "timeout",
+                          "interrupted": "cancelled"}[solver.stop_reason]
+            else:
+                status = "infeasible"
+        if not budgeted:
+            return assignment
+        stats = {"nodes": self.nodes_expanded, "backtracks": self.backtracks,
+                 "elapsed": time.perf_counter() - start}
+        if solver is not None:
+            stats.update(propagations=solver.propagations, restarts=solver.restarts,
+                         learnts=len(solver.learnts))
+        return SearchResult(status, assignment if assignment is not None else {}, stats)
+
+    # ----------------------------------------
+    # Min-conflicts local search + tabu list
+    # ----------------------------------------
+    def min_conflicts(self, max_steps=100000, time_limit=None, stall_limit=5000,
+                      tabu_tenure=10, seed=None):
+        """
+        Min-conflicts local search with a tabu list and random restarts.
+        Not complete: returns the best assignment seen, which may still have conflicts.
+
+        :param max_steps: total number of moves over all restarts
+        :param time_limit: optional wall-clock budget in seconds
+        :param stall_limit: restart from a fresh greedy assignment after this many moves without improvement
+        :param tabu_tenure: a course may not move back to a slot it just left for this many moves
+        :param seed: seed for the random tie-breaking
+        :return: (assignment, violations) where violations is the number of conflicting course pairs
+        """
+        self._ensure_bitsets()
+        rng = random.Random(seed)
+        n = len(self.courses)
+        if n == 0:
+            return {}, 0
+        neighbor_lists = self.neighbor_lists
+        slot_lists = [list(self._iter_bits(mask)) for mask in self.domain_masks]
+        if any(not slots for slots in slot_lists):
+            return None, None
+
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        best_values, best_violations = None, None
+        steps = 0
+        self.reset_counters()
+
+        while steps < max_steps:
+            values, counts, violations = self._greedy_start(slot_lists, rng)
+
+            # conflicted courses as an indexable set: list + position map
+            conflicted = [i for i in range(n) if counts[i][values[i]]]
+            where = {i: p for p, i in enumerate(conflicted)}
+            tabu = {}
+            if best_violations is None or violations < best_violations:
+                best_values, best_violations = list(values), violations
+            stall = 0
+
+            while conflicted and steps < max_steps and stall < stall_limit:
+                if deadline is not None and steps & 255 == 0 and time.perf_counter() > deadline:
+                    return self.decode_assignment(best_values), best_violations
+                steps += 1
+                stall += 1
+                self.nodes_expanded += 1
+
+                var = conflicted[rng.randrange(len(conflicted))]
+                old = values[var]
+                var_counts = counts[var]
+
+                # best non-tabu slot; a tabu slot is allowed if it beats the best total so far
+                best_slots, best_score = [], None
+                for slot in slot_lists[var]:
+                    if slot == old:
+                        continue
+                    score = var_counts[slot]
+                    if tabu.get((var, slot), -1) >= steps and \
+                            violations - var_counts[old] + score >= best_violations:
+                        continue
+                    if best_score is None or score < best_score:
+                        best_slots, best_score = [slot], score
+                    elif score == best_score:
+                        best_slots.append(slot)
+                if not best_slots:
+                    continue
+                new = rng.choice(best_slots)
+
+                violations += var_counts[new] - var_counts[old]
+                values[var] = new
+                tabu[(var, old)] = steps + tabu_tenure
+                for j in neighbor_lists[var]:
+                    counts[j][old] -= 1
+                    counts[j][new] += 1
+                for j in neighbor_lists[var] + [var]:
+                    # keep the conflicted set in sync with the counts that just changed
+                    if counts[j][values[j]]:
+                        if j not in where:
+                            where[j] = len(conflicted)
+                            conflicted.append(j)
+                    elif j in where:
+                        p = where.pop(j)
+                        last = conflicted.pop()
+                        if last != j:
+                            conflicted[p] = last
+                            where[last] = p
+
+                if violations < best_violations:
+                    best_values, best_violations = list(values), violations
+                    stall = 0
+
+            if best_violations == 0:
+                break
+
+        return self.decode_assignment(best_values), best_violations
+
+    def _greedy_start(self, slot_lists, rng):
+        """
+        Assign courses in random order, each to its least conflicting slot.
+        :return: (values, counts, violations) with counts[i][s] = neighbors of i placed in slot s
+        """
+        n = len(self.courses)
+        k = len(self.time_slots)
+        neighbor_lists = self.neighbor_lists
+        values = [-1] * n
+        counts = [[0] * k for _ in range(n)]
+        violations = 0
+
+        order = list(range(n))
+        rng.shuffle(order)
+        for i in order:
+            i_counts = counts[i]
+            slots = slot_lists[i]
+            low = min(i_counts[s] for s in slots)
+            slot = rng.choice([s for s in slots if i_counts[s] == low])
+            values[i] = slot
+            violations += low
+            for j in neighbor_lists[i]:
+                counts[j][slot] += 1
+        return values, counts, violations
+
+    # ----------------------------------------------
+    # Lower bounds: cliques and odd cycles
+    # ----------------------------------------------
+    def greedy_clique(self, starts=64):
+        """
+        Grow a clique greedily from each of the 'starts' highest-degree courses, always adding
+        the candidate with the most neighbors among the remaining candidates.
+        :return: largest clique found, as a list of course indices
+        """
+        self._ensure_bitsets()
+        neighbor_masks = self.neighbor_masks
+        order = sorted(range(len(self.courses)), key=lambda i: -len(self.neighbor_lists[i]))
+        best = []
+        for v in order[:starts]:
+            if len(self.neighbor_lists[v]) < len(best):
+                break                               # cannot beat the current clique any more
+            clique = [v]
+            candidates = neighbor_masks[v]
+            while candidates:
+                u = max(self._iter_bits(candidates),
+                        key=lambda i: (neighbor_masks[i] & candidates).bit_count())
+                clique.append(u)
+                candidates &= neighbor_masks[u]
+            if len(clique) > len(best):
+                best = clique
+        return best
+
+    def max_clique(self, node_limit=100000, initial=None):
+        """
+        Branch and bound for a maximum clique (greedy coloring bound on bitsets).
+        :param node_limit: stop after this many search nodes
+        :param initial: a known clique (course indices) to start from
+        :return: (clique as course indices, exact) where exact is False if the node limit hit
+        """
+        self._ensure_bitsets()
+        neighbor_masks = self.neighbor_masks
+        best = list(initial) if initial else []
+        nodes = 0
+
+        def color_bound(candidates):
+            # greedy sequential coloring; vertices come out with non-decreasing color numbers
+            order, colors = [], []
+            color = 0
+            while candidates:
+                color += 1
+                available = candidates
+                while available:
+                    low = available & -available
+                    v = low.bit_length() - 1
+                    available &= ~low & ~neighbor_masks[v]
+                    candidates ^= low
+                    order.append(v)
+                    colors.append(color)
+            return order, colors
+
+        def expand(clique, candidates):
+            nonlocal best, nodes
+            nodes += 1
+            if nodes > node_limit:
+                return False
+            order, colors = color_bound(candidates)
+            for p in range(len(order) - 1, -1, -1):
+                if len(clique) + colors[p] <= len(best):
+                    return True
+                v = order[p]
+                clique.append(v)
+                new_candidates = candidates & neighbor_masks[v]
+                if new_candidates:
+                    if not expand(clique, new_candidates):
+                        clique.pop()
+                        return False
+                elif len(clique) > len(best):
+                    best = list(clique)
+                clique.pop()
+                candidates &= ~(1 << v)
+            return True
+
+        exact = expand([], (1 << len(self.courses)) - 1) if self.courses else True
+        return best, exact
+
+    def _has_odd_cycle(self):
+        # BFS 2-coloring of every component
+        side = {}
+        for course in self.courses:
+            if course in side:
+                continue
+            side[course] = 0
+            queue = deque([course])
+            while queue:
+                c = queue.popleft()
+                for neighbor in self.conflicts[c]:
+                    if neighbor not in side:
+                        side[neighbor] = 1 - side[c]
+                        queue.append(neighbor)
+                    elif side[neighbor] == side[c]:
+                        return True
+        return False
+
+    def lower_bound(self, exact=False, node_limit=100000):
+        """
+        Cheap lower bound on the number of slots any schedule needs.
+        - a clique of k courses needs k slots (greedy, or bounded exact search if 'exact')
+        - an odd cycle of conflicts needs 3 slots
+        :return: (bound, clique) with the clique as course names
+        """
+        clique = self.greedy_clique()
+        if exact:
+            clique, _ = self.max_clique(node_limit, initial=clique)
+        bound = len(clique)
+        if bound < 3 and self._has_odd_cycle():
+            bound = 3
+        return bound, [self.courses[i] for i in clique]
+
+    def bound_infeasible(self):
+        """
+        Pre-solve check used by the complete solvers: True if the greedy clique needs more
+        slots than its courses can use, or some course has an empty domain.
+        The explanation is left in self.infeasible_reason.
+        """
+        if self.greedy_bound is None:
+            self.infeasible_reason = None
+            empty = [c for c in self.courses if not self.domains[c]]
+            bound, clique = self.lower_bound()
+            available = set()
+            for course in clique:
+                available.update(self.domains[course])
+            all_slots = set()
+            for course in self.courses:
+                all_slots.update(self.domains[course])
+            if empty:
+                self.infeasible_reason = f"infeasible, course {empty[0]} has no allowed slot"
+            elif len(clique) > len(available):
+                self.infeasible_reason = (f"infeasible, need >= {len(clique)} slots "
+                                          f"(conflict clique {clique}), have {len(available)}")
+            elif bound > len(all_slots):
+                self.infeasible_reason = (f"infeasible, need >= {bound} slots "
+                                          f"(odd cycle of conflicts), have {len(all_slots)}")
+            self.greedy_bound = bound
+        return self.infeasible_reason is not None
+
+    # ------------------------------------------------------
+    # Branch and bound: fewest slots, then fewest back-to-backs
+    # ------------------------------------------------------
+    def greedy_dsatur(self):
+        """
+        Greedy DSATUR coloring: repeatedly schedule the course whose scheduled neighbors use
+        the most distinct slots (ties: most conflicts) in the earliest slot still free.
+        :return: list course index -> slot position, or None if some course runs out of slots
+        """
+        self._ensure_bitsets()
+        n = len(self.courses)
+        neighbor_lists = self.neighbor_lists
+        values = [-1] * n
+        neighbor_slots = [0] * n                    # slots used by scheduled neighbors
+        heap = [(0, -len(neighbor_lists[i]), i) for i in range(n)]
+        heapq.heapify(heap)
+        while heap:
+            negative_saturation, _, i = heapq.heappop(heap)
+            if values[i] >= 0 or -negative_saturation != neighbor_slots[i].bit_count():
+                continue                            # stale heap entry
+            free = self.domain_masks[i] & ~neighbor_slots[i]
+            if not free:
+                return None
+            bit = free & -free
+            values[i] = bit.bit_length() - 1
+            for j in neighbor_lists[i]:
+                if values[j] < 0 and not neighbor_slots[j] & bit:
+                    neighbor_slots[j] |= bit
+                    heapq.heappush(heap, (-neighbor_slots[j].bit_count(), -len(neighbor_lists[j]), j))
+        return values
+
+    def edge_student_counts(self):
+        """
+        Shared-student count of every conflict, aligned with self.neighbor_lists:
+        counts[i][p] is the number of students taking both course i and neighbor_lists[i][p].
+        """
+        self._ensure_bitsets()
+        if self.pair_counts is not None:
+            courses = self.courses
+            return [[self.pair_counts.get(frozenset((courses[i], courses[j])), 0) for j in neighbors]
+                    for i, neighbors in enumerate(self.neighbor_lists)]
+        if self.graph is not None:
+            graph = self.graph
+            return [graph.edge_weights(graph.ids[c]).tolist() for c in self.courses]
+        shared = defaultdict(int)
+        index = self.index
+        for courses in self.students.values():
+            for a, b in combinations(set(courses), 2):
+                if a in index and b in index:
+                    shared[index[a], index[b]] += 1
+                    shared[index[b], index[a]] += 1
+        return [[shared[i, j] for j in neighbors] for i, neighbors in enumerate(self.neighbor_lists)]
+
+    def minimize_slots(self, back_to_back=False, node_limit=1000000, on_improve=None):
+        """
+        Branch and bound for the smallest number of slots, i.e. a schedule that only uses
+        the first m entries of self.time_slots with m as small as possible.
+        The clique lower bound and the greedy DSATUR upper bound are computed once; every
+        better schedule found tightens the upper bound of the same search.
+
+        :param back_to_back: afterwards, keep m fixed and minimize back-to-back exams, counted
+                             as shared students of conflicting courses in adjacent slots
+        :param node_limit: search nodes per phase; the incumbent is returned if it runs out
+        :param on_improve: optional callback(num_slots, assignment, back_to_back_cost) fired
+                           for every new incumbent (cost is None in the first phase)
+        :return: (num_slots, assignment), or (None, None) if no schedule fits in time_slots.
+                 self.optimization holds the bounds and whether optimality was proven.
+        """
+        self._ensure_bitsets()
+        self.reset_counters()
+        n = len(self.courses)
+        self.optimization = {"lower_bound": 0, "slots_optimal": True,
+                             "back_to_back": None, "back_to_back_optimal": None}
+        if n == 0:
+            return 0, {}
+
+        lower, _ = self.lower_bound()
+        self.optimization["lower_bound"] = lower
+        with _recursion_limit(n):
+            values, proven = self._minimize_slot_count(lower, node_limit, on_improve)
+            if values is None:
+                self.optimization["slots_optimal"] = proven
+                return None, None
+            num_slots = max(values) + 1
+            self.optimization["slots_optimal"] = proven
+
+            if back_to_back:
+                values, cost, proven = self._minimize_back_to_back(values, num_slots, node_limit, on_improve)
+                self.optimization["back_to_back"] = cost
+                self.optimization["back_to_back_optimal"] = proven
+        return num_slots, self.decode_assignment(values)
+
+    def _minimize_slot_count(self, lower, node_limit, on_improve):
+        """:return: (best values or None, proven optimal)"""
+        n = len(self.courses)
+        neighbor_lists = self.neighbor_lists
+        neighbor_masks = self.neighbor_masks
+        symmetric = len(set(self.domain_masks)) == 1
+
+        best = self.greedy_dsatur()
+        upper = len(self.time_slots) + 1 if best is None else max(best) + 1
+        if best is not None and on_improve is not None:
+            on_improve(upper, self.decode_assignment(best), None)
+        if upper <= lower:
+            return best, True
+
+        domains = list(self.domain_masks)
+        values = [-1] * n
+        slot_use = [0] * len(self.time_slots)
+        aborted = False
+
+        def search(remaining, used):
+            nonlocal best, upper, aborted
+            self.nodes_expanded += 1
+            if self.nodes_expanded > node_limit:
+                aborted = True
+                return
+            if not remaining:
+                m = used.bit_length()
+                if m < upper:
+                    best, upper = list(values), m
+                    if on_improve is not None:
+                        on_improve(m, self.decode_assignment(best), None)
+                return
+
+            # only slots below upper - 1 can still improve on the incumbent
+            allowed = (1 << (upper - 1)) - 1
+            var, var_size, var_degree = -1, 1 << 30, -1
+            for i in self._iter_bits(remaining):
+                size = (domains[i] & allowed).bit_count()
+                if size > var_size:
+                    continue
+                degree = (neighbor_masks[i] & remaining).bit_count()
+                if size < var_size or degree > var_degree:
+                    var, var_size, var_degree = i, size, degree
+            candidates = domains[var] & allowed
+            if symmetric:
+                fresh = candidates & ~used
+                if fresh:
+                    candidates = (candidates & used) | (fresh & -fresh)
+            remaining ^= 1 << var
+            neighbors = [j for j in neighbor_lists[var] if values[j] < 0]
+
+            for slot in self._iter_bits(candidates):
+                if aborted or upper <= lower:
+                    return
+                bit = 1 << slot
+                if bit > (1 << (upper - 1)) - 1:
+                    break                           # the incumbent improved meanwhile
+                values[var] = slot
+                slot_use[slot] += 1
+                pruned = []
+                ok = True
+                for j in neighbors:
+                    if domains[j] & bit:
+                        domains[j] ^= bit
+                        pruned.append(j)
+                        if not domains[j] & allowed:
+                            ok = False
+                            break
+                if ok:
+                    search(remaining, used | bit)
+                else:
+                    self.backtracks += 1
+                for j in pruned:
+                    domains[j] |= bit
+                slot_use[slot] -= 1
+                values[var] = -1
+
+        search((1 << n) - 1, 0)
+        return best, not aborted
+
+    def _minimize_back_to_back(self, start, num_slots, node_limit, on_improve):
+        """:return: (best values, back-to-back cost, proven optimal)"""
+        n = len(self.courses)
+        neighbor_lists = self.neighbor_lists
+        counts = self.edge_student_counts()
+
+        def cost_of(values):
+            total = 0
+            for i, neighbors in enumerate(neighbor_lists):
+                for p, j in enumerate(neighbors):
+                    if i < j and abs(values[i] - values[j]) == 1:
+                        total += counts[i][p]
+            return total
+
+        best = list(start)
+        best_cost = cost_of(best)
+        if best_cost == 0:
+            return best, 0, True
 
+        allowed = (1 << num_slots) - 1
+        order = sorted(range(n), key=lambda i: -sum(counts[i]))
+        values = [-1] * n
+        budget = self.nodes_expanded + node_limit
+        aborted = False
+
+        def search(depth, cost):
+            nonlocal best, best_cost, aborted
+            self.nodes_expanded += 1
+            if self.nodes_expanded > budget:
+                aborted = True
+                return
+            if depth == n:
+                best, best_cost = list(values), cost
+                if on_improve is not None:
+                    on_improve(num_slots, self.decode_assignment(best), cost)
+                return
+            var = order[depth]
+            blocked = 0
+            adjacent = [0] * num_slots              # back-to-back students per candidate slot
+            for p, j in enumerate(neighbor_lists[var]):
+                s = values[j]
+                if s < 0:
+                    continue
+                blocked |= 1 << s
+                if s > 0:
+                    adjacent[s - 1] += counts[var][p]
+                if s + 1 < num_slots:
+                    adjacent[s + 1] += counts[var][p]
+            free = self.domain_masks[var] & allowed & ~blocked
+            for slot in sorted(self._iter_bits(free), key=adjacent.__getitem__):
+                new_cost = cost + adjacent[slot]
+                if new_cost >= best_cost or aborted:
+                    continue
+                values[var] = slot
+                search(depth + 1, new_cost)
+                values[var] = -1
+                if best_cost == 0:
+                    return
+
+        search(0, 0)
+        return best, best_cost, not aborted
+
+    # ------------------------------------------------
+    # Kernelization: peel low-degree courses, merge twins
+    # ------------------------------------------------
+    def kernelize(self):
+        """
+        Reduce the conflict graph to its hard core.
+        - A course with fewer conflicts than timeslots in its domain can always be scheduled
+          after its neighbors, so it is peeled off.
+        - Two courses with the same neighbors (and the same domain) never conflict with each
+          other and can share a slot, so one is merged into the other.
+        Both rules are repeated until neither applies.
+
+        :return: (core, core_conflicts, operations) where operations lists ("peel", course)
+                 and ("twin", course, representative) in the order they were applied
+        """
+        residual = {c: set(self.conflicts[c]) for c in self.courses}
+        operations = []
+
+        def remove(course):
+            for neighbor in residual.pop(course):
+                residual[neighbor].discard(course)
+
+        changed = True
+        while changed:
+            changed = False
+
+            # peel, cascading to neighbors whose degree drops below their domain size
+            queue = deque(c for c in residual if len(residual[c]) < len(self.domains[c]))
+            while queue:
+                course = queue.popleft()
+                if course not in residual:
+                    continue
+                neighbors = residual[course]
+                remove(course)
+                operations.append(("peel", course))
+                changed = True
+                for neighbor in neighbors:
+                    if neighbor in residual and len(residual[neighbor]) < len(self.domains[neighbor]):
+                        queue.append(neighbor)
+
+            # merge courses with identical neighborhoods into the first one seen
+            representative = {}
+            for course in list(residual):
+                key = (frozenset(residual[course]), tuple(self.domains[course]))
+                rep = representative.setdefault(key, course)
+                if rep != course:
+                    remove(course)
+                    operations.append(("twin", course, rep))
+                    changed = True
+
+        core = [c for c in self.courses if c in residual]
+        return core, residual, operations
+
+    def extend_kernel_solution(self, assignment, operations):
+        """
+        Undo kernelize() on a solution of the core: twins copy their representative's slot,
+        peeled courses take any slot their already scheduled neighbors leave free.
+        """
+        assignment = dict(assignment)
+        for op in reversed(operations):
+            course = op[1]
+            if op[0] == "twin":
+                assignment[course] = assignment[op[2]]
+                continue
+            used = {assignment[c] for c in self.conflicts[course] if c in assignment}
+            for slot in self.domains[course]:
+                if slot not in used:
+                    assignment[course] = slot
+                    break
+        return assignment
+
+    def solve_with_kernel(self, method="backtracking_iterative"):
+        """
+        Kernelize, solve only the core with solver 'method', then extend greedily
+        to the peeled and merged courses.
+        """
+        core, core_conflicts, operations = self.kernelize()
+        self.kernel_size = len(core)
+        assignment = {}
+        if core:
+            sub = ExamSchedulerCSP.from_conflicts(core, core_conflicts, self.time_slots, self.domains)
+            assignment = getattr(sub, method)()
+            if assignment is None:
+                return None
+        return self.extend_kernel_solution(assignment, operations)
+
+    # ------------------------------------------------
+    # Connected-component decomposition (+ process pool)
+    # ------------------------------------------------
+    def connected_components(self):
+        """
+        Split the conflict graph into connected components.
+        :return: list of components, each a list of course names in self.courses order
+        """
+        component_of = {}
+        components = []
+        for course in self.courses:
+            if course in component_of:
+                continue
+            label = len(components)
+            component_of[course] = label
+            members = []
+            queue = deque([course])
+            while queue:
+                c = queue.popleft()
+                members.append(c)
+                for neighbor in self.conflicts[c]:
+                    if neighbor not in component_of:
+                        component_of[neighbor] = label
+                        queue.append(neighbor)
+            components.append(members)
+
+        position = {c: i for i, c in enumerate(self.courses)}
+        for members in components:
+            members.sort(key=position.__getitem__)
+        return components
+
+    def solve_by_components(self, method="backtracking_with_bitsets", workers=None):
+        """
+        Solve every connected component as its own CSP and merge the results,
+        so a failure in one component never backtracks through another.
+
+        :param method: name of a complete solver method (returns an assignment or None)
+        :param workers: number of worker processes; None or 1 solves in this process
+        :return: merged assignment, or None as soon as any component has no solution
+                 (the workers still searching other components are terminated)
+        """
+        assignment = {}
+        jobs = []
+        for members in self.connected_components():
+            if len(members) == 1:
+                # isolated course: any value of its domain works
+                course = members[0]
+                if not self.domains[course]:
+                    return None
+                assignment[course] = self.domains[course][0]
+                continue
+            conflicts = {c: self.conflicts[c] for c in members}
+            domains = {c: self.domains[c] for c in members}
+            jobs.append((members, conflicts, self.time_slots, domains, method))
+
+        if workers is None or workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                result = _solve_component(*job)
+                if result is None:
+                    return None
+                assignment.update(result)
+            return assignment
+
+        # one process per component, at most 'workers' at a time, so the ones still
+        # running can be terminated as soon as some component fails
+        results = multiprocessing.Queue()
+        queued = deque(enumerate(jobs))
+        running = {}
+        try:
+            while queued or running:
+                while queued and len(running) < workers:
+                    index, job = queued.popleft()
+                    running[index] = multiprocessing.Process(
+                        target=_component_worker, args=(results, index, job), daemon=True)
+                    running[index].start()
+                index, message = _wait_for_worker(results, running)
+                worker = running.pop(index)
+                worker.join()
+                if message is None:
+                    raise RuntimeError(f"component worker exited with code {worker.exitcode}")
+                _, result, error = message
+                if error is not None:
+                    raise error
+                if result is None:
+                    return None
+                assignment.update(result)
+            return assignment
+        finally:
+            for worker in running.values():
+                if worker.is_alive():
+                    worker.terminate()
+            for worker in running.values():
+                worker.join()
+
+    # ---------------------------------------------
+    # Parallel portfolio, first result wins
+    # ---------------------------------------------
+    def portfolio_search(self, configs=None, timeout=None):
+        """
+        Run several solver configurations at once, one worker process each, and return
+        the first definitive answer; all other workers are terminated right away.
+
+        :param configs: list of (method, kwargs, shuffle seed); defaults to DEFAULT_PORTFOLIO
+        :param timeout: optional wall-clock limit in seconds
+        :return: assignment, or None if a complete solver proved infeasibility, nobody
+                 answered within the timeout, or every member gave up.
+                 The winning config is stored in self.portfolio_winner.
+        """
+        configs = DEFAULT_PORTFOLIO if configs is None else configs
+        self.portfolio_winner = None
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(
+                target=_portfolio_worker,
+                args=(results, member, self.courses, self.conflicts, self.time_slots,
+                      self.domains, config),
+                daemon=True,
+            )
+            for member, config in enumerate(configs)
+        ]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for worker in workers:
+            worker.start()
+
+        try:
+            # a worker that dies without posting (killed, out of memory) counts as "unknown"
+            running = dict(enumerate(workers))
+            while running:
+                received = _wait_for_worker(results, running, deadline)
+                if received is None:
+                    return None
+                member, message = received
+                del running[member]
+                if message is None or message[1] == "unknown":
+                    continue
+                self.portfolio_winner = configs[member]
+                return message[2]
+            return None
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            for worker in workers:
+                worker.join()
 
 # -------------------------
 # Run template on test cases
@@ -246,4 +2414,53 @@ if __name__ == "__main__":
         print("Solution (heuristic):", sol_heur)
         print(f"Execution Time: {end - start:.6f} seconds")
 
+        print("\n-- Backtracking + MRV + Degree + Forward Checking on bitsets --")
+        start = time.perf_counter()
+        sol_bits = csp.backtracking_with_bitsets()
+        end = time.perf_counter()
+        print("Solution (bitsets):", sol_bits)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
+        print("\n-- Iterative backtracking (explicit stack + trail, indexed MRV heap) --")
+        start = time.perf_counter()
+        sol_iter = csp.backtracking_iterative()
+        end = time.perf_counter()
+        print("Solution (iterative):", sol_iter)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
+        print("\n-- AC-3 + Maintaining Arc Consistency --")
+        start = time.perf_counter()
+        sol_mac = csp.backtracking_with_mac()
+        end = time.perf_counter()
+        print("Solution (MAC):", sol_mac)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
+        print("\n-- Conflict-directed Backjumping + nogood learning --")
+        start = time.perf_counter()
+        sol_cbj = csp.backtracking_with_cbj()
+        end = time.perf_counter()
+        print("Solution (CBJ):", sol_cbj)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
+        print("\n-- CNF encoding + CDCL SAT solver --")
+        start = time.perf_counter()
+        sol_sat = csp.solve_with_sat()
+        end = time.perf_counter()
+        print("Solution (SAT):", sol_sat)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
+        print("\n-- Min-conflicts local search (incomplete) --")
+        start = time.perf_counter()
+        sol_local, violations = csp.min_conflicts(seed=0)
+        end = time.perf_counter()
+        print("Solution (min-conflicts):", sol_local, "| conflicting pairs:", violations)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
+        print("\n-- Number of valid schedules (component caching) --")
+        start = time.perf_counter()
+        num_solutions = csp.count_solutions()
+        end = time.perf_counter()
+        print("Solutions:", num_solutions)
+        print(f"Execution Time: {end - start:.6f} seconds")
+
         print("\n--- End Test Case", idx, "---")
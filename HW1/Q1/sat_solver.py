@@ -0,0 +1,391 @@
+"""
+sat_solver.py
+
+Small pure-Python CDCL SAT solver (no external binaries).
+
+- Two watched literals per clause for unit propagation.
+- First-UIP conflict analysis with clause minimization, non-chronological backjumping.
+- VSIDS variable activity with phase saving.
+- Luby restarts and periodic deletion of learnt clauses with a high LBD
+  (number of distinct decision levels in the clause).
+
+Clauses use DIMACS-style literals: variable v (1-based) is v, its negation is -v.
+
+How to use:
+> solver = SATSolver()
+> a, b = solver.new_var(), solver.new_var()
+> solver.add_clause([a, b]); solver.add_clause([-a])
+> solver.solve()          # True / False / None (stopped by a limit)
+> solver.value(b)         # True
+"""
+
+import heapq
+import time
+
+
+def luby(i):
+    """i-th element (0-based) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+
+class SATSolver:
+    """
+    Internally variable v (0-based) has literals 2v (positive) and 2v+1 (negative),
+    so the negation of a literal is lit ^ 1.
+    """
+    RESTART_BASE = 100                             # conflicts per Luby unit
+    VAR_DECAY = 0.95
+    CLOCK_EVERY = 64                               # loop steps (decisions + conflicts) between two clock reads
+
+    def __init__(self, num_vars=0):
+        self.num_vars : int = 0
+        self.clauses : list = []                   # clause index -> list of literals, None if deleted
+        self.learnts : list = []                   # indices of learnt clauses
+        self.lbd : dict = {}                       # learnt clause index -> LBD
+        self.watches : list = []                   # literal -> clause indices watching it
+        self.values : list = []                    # literal -> 1 true, 0 false, -1 unassigned
+        self.level : list = []
+        self.reason : list = []                    # var -> clause index that implied it, or -1
+        self.activity : list = []
+        self.polarity : list = []                  # saved phase, True = positive
+        self.trail : list = []
+        self.trail_lim : list = []                 # trail length at the start of each level
+        self.qhead : int = 0
+        self.heap : list = []                      # (-activity, var), stale entries skipped
+        self.var_inc : float = 1.0
+        self.ok : bool = True                      # False once the formula is known unsat
+        self.model = None
+        self.stop_reason = None
+        self.decisions : int = 0
+        self.conflicts : int = 0
+        self.propagations : int = 0
+        self.restarts : int = 0
+        for _ in range(num_vars):
+            self.new_var()
+
+    def new_var(self):
+        """Add a variable and return its DIMACS number."""
+        v = self.num_vars
+        self.num_vars += 1
+        self.watches.append([])
+        self.watches.append([])
+        self.values.append(-1)
+        self.values.append(-1)
+        self.level.append(0)
+        self.reason.append(-1)
+        self.activity.append(0.0)
+        self.polarity.append(False)
+        heapq.heappush(self.heap, (0.0, v))
+        return v + 1
+
+    @staticmethod
+    def _to_internal(lit):
+        return 2 * (lit - 1) if lit > 0 else 2 * (-lit - 1) + 1
+
+    def add_clause(self, lits):
+        """
+        Add a clause (list of DIMACS literals) before solving.
+        :return: False if the formula became unsatisfiable
+        """
+        if not self.ok:
+            return False
+        values = self.values
+        clause = []
+        for lit in sorted(set(self._to_internal(l) for l in lits)):
+            if lit ^ 1 in clause or values[lit] == 1:
+                return True                        # tautology or already satisfied
+            if values[lit] == 0:
+                continue                           # false at level 0
+            clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._enqueue(clause[0], -1)
+            self.ok = self._propagate() < 0
+        else:
+            self._attach(clause)
+        return self.ok
+
+    def _attach(self, clause):
+        ci = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(ci)
+        self.watches[clause[1]].append(ci)
+        return ci
+
+    def value(self, lit):
+        """Value of a DIMACS literal in the last model (None if not solved)."""
+        if self.model is None:
+            return None
+        v = self.model[abs(lit) - 1]
+        return v if lit > 0 else not v
+
+    # -------------------------
+    # Assignment + propagation
+    # -------------------------
+    def _enqueue(self, lit, reason):
+        v = lit >> 1
+        self.values[lit] = 1
+        self.values[lit ^ 1] = 0
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """Unit propagation over the trail. :return: index of a conflicting clause, or -1"""
+        values = self.values
+        watches = self.watches
+        clauses = self.clauses
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            watching = watches[false_lit]
+            kept = []
+            for pos, ci in enumerate(watching):
+                clause = clauses[ci]
+                if clause is None:
+                    continue                       # deleted learnt clause, drop the watch
+                # keep the false watch at position 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if values[first] == 1:
+                    kept.append(ci)
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if values[lit] != 0:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(ci)
+                        break
+                else:
+                    kept.append(ci)
+                    if values[first] == 0:
+                        kept.extend(watching[pos + 1:])
+                        watches[false_lit] = kept
+                        self.qhead = len(trail)
+                        return ci
+                    self._enqueue(first, ci)
+            watches[false_lit] = kept
+        return -1
+
+    def _cancel_until(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        values = self.values
+        activity = self.activity
+        heap = self.heap
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            v = lit >> 1
+            values[lit] = values[lit ^ 1] = -1
+            self.reason[v] = -1
+            self.polarity[v] = not lit & 1
+            heapq.heappush(heap, (-activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = start
+        if len(heap) > 4 * self.num_vars + 1000:
+            self._rebuild_heap()
+
+    # -------------------------
+    # Decisions (VSIDS)
+    # -------------------------
+    def _rebuild_heap(self):
+        values = self.values
+        self.heap = [(-self.activity[v], v) for v in range(self.num_vars) if values[2 * v] < 0]
+        heapq.heapify(self.heap)
+
+    def _bump(self, v):
+        activity = self.activity
+        activity[v] += self.var_inc
+        if activity[v] > 1e100:
+            for u in range(self.num_vars):
+                activity[u] *= 1e-100
+            self.var_inc *= 1e-100
+            self._rebuild_heap()
+        elif self.values[2 * v] < 0:
+            heapq.heappush(self.heap, (-activity[v], v))
+
+    def _pick_branch_literal(self):
+        heap = self.heap
+        values = self.values
+        activity = self.activity
+        while heap:
+            neg_activity, v = heapq.heappop(heap)
+            if values[2 * v] < 0 and -neg_activity == activity[v]:
+                return 2 * v if self.polarity[v] else 2 * v + 1
+        # every entry was stale; fall back to a scan
+        for v in range(self.num_vars):
+            if values[2 * v] < 0:
+                return 2 * v if self.polarity[v] else 2 * v + 1
+        return -1
+
+    # -------------------------
+    # Conflict analysis
+    # -------------------------
+    def _analyze(self, confl):
+        """
+        First-UIP learning.
+        :return: (learnt clause with the asserting literal first, backjump level, LBD)
+        """
+        clauses = self.clauses
+        level = self.level
+        reason = self.reason
+        trail = self.trail
+        current = len(self.trail_lim)
+        seen = set()
+        learnt = [-1]
+        pending = 0
+        lit = -1
+        index = len(trail) - 1
+        clause = clauses[confl]
+        while True:
+            for q in (clause if lit < 0 else clause[1:]):
+                v = q >> 1
+                if v not in seen and level[v] > 0:
+                    seen.add(v)
+                    self._bump(v)
+                    if level[v] >= current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while trail[index] >> 1 not in seen:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            pending -= 1
+            if not pending:
+                break
+            clause = clauses[reason[lit >> 1]]
+        learnt[0] = lit ^ 1
+
+        # drop literals implied by other literals of the clause (local minimization)
+        in_clause = {q >> 1 for q in learnt}
+        minimized = [learnt[0]]
+        for q in learnt[1:]:
+            ci = reason[q >> 1]
+            if ci < 0 or any(r >> 1 not in in_clause and level[r >> 1] > 0
+                             for r in clauses[ci][1:]):
+                minimized.append(q)
+        learnt = minimized
+
+        backjump = 0
+        if len(learnt) > 1:
+            best = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            backjump = level[learnt[1] >> 1]
+        lbd = len({level[q >> 1] for q in learnt})
+        return learnt, backjump, lbd
+
+    def _reduce_db(self):
+        """Delete the worse half of the learnt clauses (highest LBD), keeping reasons and LBD <= 2."""
+        clauses = self.clauses
+        reason = self.reason
+        values = self.values
+        lbd = self.lbd
+        self.learnts.sort(key=lambda ci: lbd[ci])
+        keep = self.learnts[:len(self.learnts) // 2]
+        for ci in self.learnts[len(self.learnts) // 2:]:
+            first = clauses[ci][0]
+            locked = values[first] == 1 and reason[first >> 1] == ci
+            if lbd[ci] <= 2 or locked:
+                keep.append(ci)
+            else:
+                clauses[ci] = None
+                del lbd[ci]
+        self.learnts = keep
+
+    # -------------------------
+    # Main loop
+    # -------------------------
+    def solve(self, conflict_limit=None, time_limit=None, interrupt=None):
+        """
+        Search for a satisfying assignment.
+        :param conflict_limit: stop after this many conflicts
+        :param time_limit: stop after this many seconds
+        :param interrupt: callable checked with the clock; stop when it returns True
+        :return: True (model in self.model), False (unsatisfiable) or None if stopped,
+                 with the reason ("conflict_limit", "timeout", "interrupted") in self.stop_reason
+        """
+        self.model = None
+        self.stop_reason = None
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        if self._propagate() >= 0:
+            self.ok = False
+            return False
+
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        start_conflicts = self.conflicts
+        restart = 0
+        restart_at = self.RESTART_BASE * luby(restart)
+        since_restart = 0
+        max_learnts = max(len(self.clauses) // 3, 2000)
+        steps = 0
+
+        while True:
+            # an easy instance may finish with a handful of conflicts, so poll per step
+            if steps % self.CLOCK_EVERY == 0:
+                if deadline is not None and time.perf_counter() > deadline:
+                    self.stop_reason = "timeout"
+                elif interrupt is not None and interrupt():
+                    self.stop_reason = "interrupted"
+                if self.stop_reason is not None:
+                    self._cancel_until(0)
+                    return None
+            steps += 1
+            confl = self._propagate()
+            if confl >= 0:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, backjump, lbd = self._analyze(confl)
+                self._cancel_until(backjump)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], -1)
+                else:
+                    ci = self._attach(learnt)
+                    self.learnts.append(ci)
+                    self.lbd[ci] = lbd
+                    self._enqueue(learnt[0], ci)
+                self.var_inc /= self.VAR_DECAY
+
+                if conflict_limit is not None and self.conflicts - start_conflicts >= conflict_limit:
+                    self.stop_reason = "conflict_limit"
+                    self._cancel_until(0)
+                    return None
+                continue
+
+            if since_restart >= restart_at:
+                self.restarts += 1
+                restart += 1
+                restart_at = self.RESTART_BASE * luby(restart)
+                since_restart = 0
+                self._cancel_until(0)
+                continue
+            if len(self.learnts) - len(self.trail) >= max_learnts:
+                self._reduce_db()
+                max_learnts = int(max_learnts * 1.1)
+
+            lit = self._pick_branch_literal()
+            if lit < 0:
+                self.model = [self.values[2 * v] == 1 for v in range(self.num_vars)]
+                self._cancel_until(0)
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(lit, -1)
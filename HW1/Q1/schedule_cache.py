@@ -0,0 +1,239 @@
+"""
+schedule_cache.py
+
+Persistent on-disk cache of conflict graphs and solved schedules.
+
+- Entries are keyed by a SHA-256 of the canonical (courses, enrollments, time slots).
+- The CSR conflict graph is stored in one binary file that is memory-mapped on load,
+  so a hit costs a file open instead of rebuilding the graph.
+- The last solution of each entry is stored next to it as JSON. Course names and
+  timeslots keep their type (tuples and dates are tagged); other types are rejected.
+- Files are written to a temporary name and renamed into place, and an entry that
+  cannot be read is treated as a miss.
+- The cache is bounded in bytes; the least recently used entries are evicted first.
+
+How to use:
+> cache = ScheduleCache(".schedule_cache")
+> assignment = solve_with_cache(cache, courses, students, time_slots)
+"""
+
+from array import array
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+
+from conflict_graph import ConflictGraph, build_conflict_graph
+from exam_scheduler import ExamSchedulerCSP
+
+MAGIC = b"CSPG"
+VERSION = 1
+# magic, version, number of courses, number of CSR entries
+HEADER = struct.Struct("<4sIqq")
+
+
+def canonical_key(courses, students, time_slots):
+    """
+    Hash of the instance that ignores dict order and duplicate enrollments.
+    Values are encoded with repr, so 1 and "1" (or [1, 2] and ["1", "2"]) hash differently.
+    """
+    payload = {
+        "courses": sorted(map(repr, courses)),
+        "students": sorted((repr(s), sorted(set(map(repr, cs)))) for s, cs in students.items()),
+        "time_slots": [repr(t) for t in time_slots],
+    }
+    blob = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _encode(value):
+    """JSON-ready form of a course name or timeslot that decodes back to the same type."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(v) for v in value]}
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    raise TypeError(f"cannot cache a value of type {type(value).__name__}: {value!r}")
+
+
+def _decode(value):
+    if not isinstance(value, dict):
+        return value
+    if "tuple" in value:
+        return tuple(_decode(v) for v in value["tuple"])
+    if "datetime" in value:
+        return datetime.datetime.fromisoformat(value["datetime"])
+    return datetime.date.fromisoformat(value["date"])
+
+
+def _write_json(path, obj):
+    # encode fully first, then rename, so a failure never leaves a truncated file behind
+    blob = json.dumps(obj)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+
+
+def write_graph(path, graph):
+    """Write a ConflictGraph as header + int64 indptr + int32 indices + int32 weights."""
+    indptr = array("q", graph.indptr)
+    indices = array("i", graph.indices)
+    weights = array("i", graph.weights)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(graph), len(indices)))
+        indptr.tofile(f)
+        indices.tofile(f)
+        weights.tofile(f)
+    os.replace(tmp, path)
+
+
+def read_graph(path, names):
+    """
+    Memory-map a graph written by write_graph.
+    The CSR arrays are memoryviews into the mapping, so nothing is copied up front.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, n, nnz = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or version != VERSION or n != len(names):
+        mapped.close()
+        raise ValueError(f"{path} is not a compatible conflict graph file")
+    view = memoryview(mapped)
+    start = HEADER.size
+    indptr = view[start:start + 8 * (n + 1)].cast("q")
+    start += 8 * (n + 1)
+    indices = view[start:start + 4 * nnz].cast("i")
+    start += 4 * nnz
+    weights = view[start:start + 4 * nnz].cast("i")
+    return ConflictGraph(names, indptr, indices, weights)
+
+
+class ScheduleCache:
+    """
+    Directory of cache entries, one sub-directory per key:
+    names.json (course ids), graph.bin (CSR graph) and solution.json (last schedule).
+    """
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory : str = directory
+        self.max_bytes : int = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def _touch(self, key):
+        os.utime(self._entry(key))
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self._entry(key), "graph.bin"))
+
+    def load_graph(self, key):
+        """:return: memory-mapped ConflictGraph for 'key', or None on a miss (or an unreadable entry)"""
+        if key not in self:
+            return None
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, "names.json")) as f:
+                names = [_decode(name) for name in json.load(f)]
+            graph = read_graph(os.path.join(entry, "graph.bin"), names)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._touch(key)
+        return graph
+
+    def store_graph(self, key, graph):
+        entry = self._entry(key)
+        names = [_encode(name) for name in graph.names]
+        os.makedirs(entry, exist_ok=True)
+        _write_json(os.path.join(entry, "names.json"), names)
+        write_graph(os.path.join(entry, "graph.bin"), graph)
+        self.evict()
+
+    def load_solution(self, key):
+        """:return: the last stored schedule for 'key' (dict course -> timeslot), or None"""
+        path = os.path.join(self._entry(key), "solution.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                pairs = json.load(f)
+            solution = {_decode(course): _decode(slot) for course, slot in pairs}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._touch(key)
+        return solution
+
+    def store_solution(self, key, assignment):
+        """:raises TypeError: for a course or timeslot type the cache cannot store (nothing is written)"""
+        # pairs instead of an object so non-string courses and timeslots survive the round trip
+        pairs = [[_encode(course), _encode(slot)] for course, slot in assignment.items()]
+        entry = self._entry(key)
+        os.makedirs(entry, exist_ok=True)
+        _write_json(os.path.join(entry, "solution.json"), pairs)
+        self.evict()
+
+    def size(self):
+        total = 0
+        for key in os.listdir(self.directory):
+            entry = self._entry(key)
+            for name in os.listdir(entry):
+                total += os.path.getsize(os.path.join(entry, name))
+        return total
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for key in os.listdir(self.directory):
+            entry = self._entry(key)
+            size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, key))
+            total += size
+        entries.sort()
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+
+
+def load_or_build(cache, courses, students, time_slots):
+    """
+    Return (csp, key): the CSP is built from the cached graph when the instance was seen
+    before, otherwise the graph is built once and stored.
+    """
+    key = canonical_key(courses, students, time_slots)
+    graph = cache.load_graph(key)
+    if graph is None:
+        enrollments = ((s, c) for s, cs in students.items() for c in cs)
+        graph = build_conflict_graph(enrollments, courses=courses)
+        cache.store_graph(key, graph)
+    csp = ExamSchedulerCSP.from_graph(graph, time_slots)
+    csp.students = students
+    return csp, key
+
+
+def solve_with_cache(cache, courses, students, time_slots, method="backtracking_iterative"):
+    """
+    Look up the last schedule of this exact instance; on a miss, solve it with 'method'
+    and store the result. Instances that do not solve are not cached as solutions.
+    A cached schedule is only used if it covers exactly these courses with these time slots.
+    """
+    key = canonical_key(courses, students, time_slots)
+    cached = cache.load_solution(key)
+    if (cached is not None and set(cached) == set(courses)
+            and all(slot in time_slots for slot in cached.values())):
+        return cached
+    csp, key = load_or_build(cache, courses, students, time_slots)
+    assignment = getattr(csp, method)()
+    if assignment is not None:
+        cache.store_solution(key, assignment)
+    return assignment
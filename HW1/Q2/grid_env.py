@@ -4,12 +4,11 @@
 # After finishing the search 
 
 import pygame
-import copy
-import time
 import random
 import sys
 import math
-from search import depth_first_search, breadth_first_search, uniform_cost_search, a_star_search
+from grid_map import GridMap
+from search import SearchRecorder, a_star, bfs, bidirectional_a_star, bidirectional_bfs, dfs, ucs
 
 WIDTH, HEIGHT = 600, 600
 ROWS, COLS = 15, 15
@@ -60,21 +59,25 @@ def get_neighbors_fn(grid, weighted=False):
         return results
     return neighbors
 
-def draw_grid(screen, grid, start, goal, current_pos):
+def draw_grid(screen, grid, start, goal, current_pos, marks=None):
+    # marks: optional dict cell -> 2 (expanded) / 3 (path) from SearchRecorder.marks(),
+    # drawn over the terrain so the grid itself is never modified
+    marks = marks or {}
     for x in range(ROWS):
         for y in range(COLS):
             rect = pygame.Rect(y*CELL_SIZE, x*CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            cell = marks.get((x, y), grid[x][y])
             if (x, y) == start:
                 color = GREEN
             elif (x, y) == goal:
                 color = RED
-            elif grid[x][y] is None:
+            elif cell is None:
                 color = BLACK
-            elif grid[x][y] == 5:
+            elif cell == 5:
                 color = BROWN
-            elif grid[x][y] == 2:
+            elif cell == 2:
                 color= (0,220,0)
-            elif grid[x][y] == 3:
+            elif cell == 3:
                 color= (128,0,128)
             else:
                 color = WHITE
@@ -87,49 +90,66 @@ def draw_grid(screen, grid, start, goal, current_pos):
         rect = pygame.Rect(cy*CELL_SIZE, cx*CELL_SIZE, CELL_SIZE, CELL_SIZE)
         pygame.draw.rect(screen, (0,255,255), rect)
 
-def run(start,goal,grid):
-    print("\nChoose algorithm:")
-    print("1: DFS")
-    print("2: BFS")
-    print("3: UCS")
-    print("4: A* (Manhattan)")
-    print("5: A* (Euclidean)")
-    choice = input("Enter choice: ")
-
-    if choice == "1":  # DFS
-        algo = lambda s, g: depth_first_search(
-            s, g, get_neighbors_fn(grid, weighted=False),grid
-        )
-    elif choice == "2":  # BFS
-        algo = lambda s, g: breadth_first_search(
-            s, g, get_neighbors_fn(grid, weighted=False),grid
-        )
-    elif choice == "3":  # UCS
-        algo = lambda s, g: uniform_cost_search(
-            s, g, get_neighbors_fn(grid, weighted=True),grid
-        )
-    elif choice == "4":  # A* Manhattan
-        algo = lambda s, g: a_star_search(
-            s, g, get_neighbors_fn(grid, weighted=True),
-            "manhattan",grid
-        )
-    elif choice == "5":  # A* Euclidean
-        algo = lambda s, g: a_star_search(
-            s, g, get_neighbors_fn(grid, weighted=True),
-            "euclidean",grid
-        )
+ALGORITHMS = {
+    "1": "DFS",
+    "2": "BFS",
+    "3": "UCS",
+    "4": "A* (Manhattan)",
+    "5": "A* (Euclidean)",
+    "6": "Bidirectional BFS",
+    "7": "Bidirectional A* (Manhattan)",
+}
+
+def search(choice, start, goal, grid, recorder=None, open_list="heap"):
+    """
+    Run algorithm 'choice' (a key of ALGORITHMS) headless.
+    The grid (list of lists or GridMap) is only read; returns a SearchResult.
+    :param open_list: "heap" or "buckets" for UCS and A* (Manhattan)
+    """
+    if isinstance(grid, GridMap):
+        unweighted = weighted = grid
     else:
+        unweighted = get_neighbors_fn(grid, weighted=False)
+        weighted = get_neighbors_fn(grid, weighted=True)
+    if choice == "1":  # DFS
+        return dfs(start, goal, unweighted, recorder)
+    if choice == "2":  # BFS
+        return bfs(start, goal, unweighted, recorder)
+    if choice == "3":  # UCS
+        return ucs(start, goal, weighted, recorder, open_list)
+    if choice == "4":  # A* Manhattan
+        return a_star(start, goal, weighted, "manhattan", recorder, open_list)
+    if choice == "5":  # A* Euclidean
+        return a_star(start, goal, weighted, "euclidean", recorder)
+    if choice == "6":  # Bidirectional BFS
+        return bidirectional_bfs(start, goal, unweighted, recorder)
+    if choice == "7":  # Bidirectional A* Manhattan
+        return bidirectional_a_star(start, goal, weighted, "manhattan", recorder)
+    raise ValueError(f"unknown algorithm choice {choice!r}")
+
+def run(start, goal, grid, choice=None, recorder=None):
+    """
+    Run one search and print its stats.
+    :param choice: key of ALGORITHMS; asked with input() when None
+    :param recorder: optional SearchRecorder that receives the trace for drawing
+    :return: path
+    """
+    if choice is None:
+        print("\nChoose algorithm:")
+        for key, name in ALGORITHMS.items():
+            print(f"{key}: {name}")
+        choice = input("Enter choice: ")
+
+    if choice not in ALGORITHMS:
         print("Invalid choice")
         pygame.quit()
         sys.exit()
 
-    
-    start_time = time.perf_counter()
-    path = algo(start, goal)
-    end_time = time.perf_counter()
-
-    print(f"Exe Time: {end_time - start_time:.6f} seconds")
-    return path
+    result = search(choice, start, goal, grid, recorder)
+    print(f'Visited Blocks : {result.generated}')
+    print(f'Weight : {result.cost}')
+    print(f"Exe Time: {result.elapsed:.6f} seconds")
+    return result.path
 
 def main():
     pygame.init()
@@ -138,12 +158,12 @@ def main():
 
     while True:  # outer loop for restart
         grid = generate_grid()
-        copy_grid = copy.deepcopy(grid)
         start = random_empty_cell(grid)
         goal = random_empty_cell(grid)
-    
 
-        path = run(start,goal,grid)
+        # the searches only read the grid, so reruns reuse it as is
+        recorder = SearchRecorder()
+        path = run(start, goal, grid, recorder=recorder)
         step = 0
         clock = pygame.time.Clock()
 
@@ -161,16 +181,16 @@ def main():
                         running = False
                     if event.key == pygame.K_s: # run the algos again on the same grid
                         step = 0
-                        grid = copy.deepcopy(copy_grid)
                         screen.fill(WHITE)
                         current_pos = start
                         draw_grid(screen, grid, start, goal, current_pos)
-                        path = run(start,goal,grid)
+                        recorder = SearchRecorder()
+                        path = run(start, goal, grid, recorder=recorder)
 
 
             screen.fill(WHITE)
             current_pos = path[step] if path and step < len(path) else start
-            draw_grid(screen, grid, start, goal, current_pos)
+            draw_grid(screen, grid, start, goal, current_pos, recorder.marks())
             pygame.display.flip()
 
             if path and step < len(path) - 1:
@@ -0,0 +1,97 @@
+"""
+grid_map.py
+
+Compact grid for large maps (e.g. 2000 x 2000).
+
+- One flat bytearray holds the step cost of every cell (0 = obstacle), so a cell is
+  an integer id instead of an (x, y) tuple.
+- The map is padded with a one-cell obstacle border: every move from an inner cell
+  lands inside the array and the border is never passable, so no bounds checks.
+- Moves are precomputed id offsets, in the same order as get_neighbors_fn.
+
+How to use:
+> grid_map = GridMap.from_grid(generate_grid())
+> result = a_star(start, goal, grid_map, "manhattan")
+"""
+
+from array import array
+
+WALL = 0
+
+
+class GridMap:
+    """
+    rows x cols map; cell (x, y) has id (x + 1) * width + (y + 1) with width = cols + 2.
+    costs[id] is the cost of stepping onto the cell (1..255), or 0 for an obstacle.
+    """
+    def __init__(self, rows, cols, costs=None):
+        self.rows : int = rows
+        self.cols : int = cols
+        self.width : int = cols + 2
+        self.size : int = (rows + 2) * self.width
+        self.costs : bytearray = bytearray(self.size) if costs is None else costs
+        if len(self.costs) != self.size:
+            raise ValueError(f"expected {self.size} cost bytes, got {len(self.costs)}")
+        # id offsets of the moves right, down, up, left
+        self.offsets : tuple = (1, self.width, -self.width, -1)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Build from a list of lists as made by generate_grid (None = obstacle)."""
+        rows = len(grid)
+        cols = len(grid[0]) if rows else 0
+        grid_map = cls(rows, cols)
+        costs = grid_map.costs
+        for x, row in enumerate(grid):
+            base = (x + 1) * grid_map.width + 1
+            for y, cost in enumerate(row):
+                if cost is not None:
+                    costs[base + y] = cost
+        return grid_map
+
+    def to_grid(self):
+        """:return: list of lists with None for obstacles, e.g. for draw_grid"""
+        width = self.width
+        return [[self.costs[(x + 1) * width + y + 1] or None for y in range(self.cols)]
+                for x in range(self.rows)]
+
+    def id(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, i):
+        x, y = divmod(i, self.width)
+        return (x - 1, y - 1)
+
+    def passable(self, cell):
+        x, y = cell
+        return 0 <= x < self.rows and 0 <= y < self.cols and self.costs[self.id(cell)] != WALL
+
+    def neighbors(self, cell, weighted=False):
+        """Same output as get_neighbors_fn(grid, weighted)(cell); for callers that need tuples."""
+        i = self.id(cell)
+        costs = self.costs
+        result = []
+        for offset in self.offsets:
+            j = i + offset
+            if costs[j]:
+                result.append((self.cell(j), costs[j]) if weighted else self.cell(j))
+        return result
+
+    def parent_array(self):
+        """Fresh per-cell int array filled with -1, for parent links during a search."""
+        return array("i", [-1]) * self.size
+
+    def path_to(self, parents, start, goal):
+        """
+        Follow parent ids from goal back to start (parents[start] == start).
+        :return: list of (x, y) cells from start to goal, [] if goal was never reached
+        """
+        if parents[goal] < 0:
+            return []
+        path = [goal]
+        node = goal
+        while node != start:
+            node = parents[node]
+            path.append(node)
+        path.reverse()
+        return [self.cell(i) for i in path]
@@ -3,10 +3,23 @@ search.py
 
 Students must implement TODO sections.
 Includes: BFS, DFS, UCS, A* (with Manhattan & Euclidean heuristics).
+
+- bfs / dfs / ucs / a_star are headless: they never touch the grid or print,
+  and return a SearchResult (path, cost, expansions, timing).
+- Pass a SearchRecorder to keep the expansion order for visualization.
+- Every search also accepts a GridMap (grid_map.py) in place of neighbors_fn and then
+  runs on integer cell ids and flat arrays instead of tuples and dicts.
+- bidirectional_bfs / bidirectional_a_star grow one frontier from each end and stop
+  once no shorter meeting point can exist (moves are assumed reversible, as on the grid).
+- breadth_first_search / depth_first_search / uniform_cost_search / a_star_search
+  keep the old interface: paint the grid (2 = expanded, 3 = path), print and return the path.
 """
+from array import array
 from collections import deque
 import heapq
 import math
+import time
+from grid_map import GridMap
 
 def heuristic_manhattan(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
@@ -15,124 +28,190 @@ def heuristic_euclidean(a, b):
     return math.sqrt(abs(a[0] - b[0]) ** 2 + abs(a[1] - b[1]) ** 2)
 
 # ---------------------
-# BFS
+# Results + recording
 # ---------------------
-def breadth_first_search(start, goal, neighbors_fn, grid):
-    checked_list = []
-    weight = 0
-    queue = deque()
+class SearchResult:
+    """
+    Outcome of one search run.
+    path: list of cells from start to goal ([] if the goal is unreachable)
+    cost: path cost (number of steps for BFS/DFS), None if unreachable
+    expansions: nodes taken off the frontier, generated: nodes discovered besides start
+    elapsed: wall-clock seconds
+    """
+    def __init__(self, path, cost, expansions, generated, elapsed):
+        self.path : list = path
+        self.cost = cost
+        self.expansions : int = expansions
+        self.generated : int = generated
+        self.elapsed : float = elapsed
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+    def __repr__(self):
+        return (f"SearchResult(found={self.found}, cost={self.cost}, length={len(self.path)}, "
+                f"expansions={self.expansions}, generated={self.generated}, "
+                f"elapsed={self.elapsed:.6f})")
+
+
+class SearchRecorder:
+    """Optional trace of a search run: the expansion order and the final path."""
+    EXPANDED = 2
+    PATH = 3
+
+    def __init__(self):
+        self.expanded : list = []
+        self.path : list = []
+
+    def expand(self, node):
+        self.expanded.append(node)
+
+    def finish(self, path):
+        self.path = list(path)
+
+    def marks(self):
+        """:return: dict cell -> 2 (expanded) or 3 (on the path), the codes draw_grid uses"""
+        marks = dict.fromkeys(self.expanded, self.EXPANDED)
+        marks.update(dict.fromkeys(self.path, self.PATH))
+        return marks
+
+    def paint(self, grid):
+        """Write the trace into a grid the way the old searches did."""
+        for (x, y), mark in self.marks().items():
+            grid[x][y] = mark
+
+
+def _reconstruct(parents, goal):
+    if goal not in parents:
+        return []
     path = []
-    visited = dict()
-    visited[start] = (None,0)
-    queue.append(start)
-    node = start
-    while queue:
-        node = queue.popleft()
-        weight = visited[node][1]
-        if node == goal:
-            break
-        x = node[0]
-        y = node[1]
-        for blocks in neighbors_fn(node):
-            if blocks not in visited:
-                if blocks not in checked_list: checked_list.append(blocks)
-                grid[x][y] = 2
-                visited[blocks] = ((x, y),weight+1)
-                queue.append(blocks)
-
-    weight = visited[goal][1]
+    node = goal
     while node is not None:
         path.append(node)
-        grid[node[0]][node[1]] = 3
-        node = visited[node][0]
-
+        node = parents[node]
     path.reverse()
-    print(f'Visited Blocks : {len(checked_list)}')
-    print(f'Weight : {weight}')
-
     return path
 
 
+def _finish(parents, costs, goal, expansions, started, recorder):
+    path = _reconstruct(parents, goal)
+    if recorder is not None:
+        recorder.finish(path)
+    cost = costs[goal] if path else None
+    return SearchResult(path, cost, expansions, len(parents) - 1, time.perf_counter() - started)
+
+
+def _finish_map(grid_map, parents, start, goal, cost, expansions, generated, started, recorder):
+    path = grid_map.path_to(parents, start, goal)
+    if recorder is not None:
+        recorder.finish(path)
+    return SearchResult(path, cost if path else None, expansions, generated,
+                        time.perf_counter() - started)
+
+
+def _unweighted_map_search(grid_map, start, goal, recorder, depth_first):
+    # BFS / DFS over cell ids: the frontier is a plain list, popped from the front
+    # (via a head index) for BFS and from the back for DFS
+    started = time.perf_counter()
+    costs = grid_map.costs
+    offsets = grid_map.offsets
+    start, goal = grid_map.id(start), grid_map.id(goal)
+    parents = grid_map.parent_array()
+    parents[start] = start
+    frontier = [start]
+    head = 0
+    expansions = 0
+    generated = 0
+    while head < len(frontier):
+        if depth_first:
+            node = frontier.pop()
+        else:
+            node = frontier[head]
+            head += 1
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(grid_map.cell(node))
+        if node == goal:
+            break
+        for offset in offsets:
+            neighbor = node + offset
+            if costs[neighbor] and parents[neighbor] < 0:
+                parents[neighbor] = node
+                frontier.append(neighbor)
+                generated += 1
+    result = _finish_map(grid_map, parents, start, goal, 0, expansions, generated, started, recorder)
+    if result.found:
+        result.cost = len(result.path) - 1
+    return result
 
 # ---------------------
-# DFS
+# BFS
 # ---------------------
-def depth_first_search(start, goal, neighbors_fn,grid):
-    checked_list = []
-    weight = 0
-    queue = deque()
-    path = []
-    visited = dict()
-    visited[start] = (None,0)
-    queue.append(start)
-    node = start
+def bfs(start, goal, neighbors_fn, recorder=None):
+    """
+    Breadth-first search on an unweighted neighbors_fn (cell -> list of cells).
+    :return: SearchResult with the fewest-steps path
+    """
+    if isinstance(neighbors_fn, GridMap):
+        return _unweighted_map_search(neighbors_fn, start, goal, recorder, depth_first=False)
+    started = time.perf_counter()
+    parents = {start: None}
+    costs = {start: 0}
+    queue = deque([start])
+    expansions = 0
     while queue:
-        node = queue.pop()
-        weight = visited[node][1]
+        node = queue.popleft()
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(node)
         if node == goal:
             break
-        x = node[0]
-        y = node[1]
-        for blocks in neighbors_fn(node):
-            if blocks not in visited:
-                if blocks not in checked_list: checked_list.append(blocks)
-                grid[x][y] = 2
-                visited[blocks] = ((x, y),weight + 1)
-                queue.append(blocks)
-
-    weight = visited[goal][1]
-    while node is not None:
-        path.append(node)
-        grid[node[0]][node[1]] = 3
-        node = visited[node][0]
-
-    path.reverse()
-    print(f'Visited Blocks : {len(checked_list)}')
-    print(f'Weight : {weight}')
-
-    return path
-
+        for neighbor in neighbors_fn(node):
+            if neighbor not in parents:
+                parents[neighbor] = node
+                costs[neighbor] = costs[node] + 1
+                queue.append(neighbor)
+    return _finish(parents, costs, goal, expansions, started, recorder)
 
 # ---------------------
-# UCS
+# DFS
 # ---------------------
-def uniform_cost_search(start, goal, neighbors_fn,grid):
-    block_counter = 0
-    checked_list = []
-    heap = []
-    path = []
-    visited = {}
-    visited[start] = (None, 0)
-    heapq.heappush(heap, (0, start)) 
-    
-    while heap :
-        node = heapq.heappop(heap)
-        x,y = node[1][0],node[1][1]
-        grid[x][y] = 2
-        weight = node[0]
-        if node[1] == goal:
+def dfs(start, goal, neighbors_fn, recorder=None):
+    """Depth-first search on an unweighted neighbors_fn. :return: SearchResult"""
+    if isinstance(neighbors_fn, GridMap):
+        return _unweighted_map_search(neighbors_fn, start, goal, recorder, depth_first=True)
+    started = time.perf_counter()
+    parents = {start: None}
+    costs = {start: 0}
+    stack = [start]
+    expansions = 0
+    while stack:
+        node = stack.pop()
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(node)
+        if node == goal:
             break
-        for blocks in neighbors_fn(node[1]):
-            cost = blocks[1]+weight
-            # if blocks[0] not in visited or cost < visited[blocks[0]][1]:
-            if blocks[0] not in visited:
-                if blocks not in checked_list: checked_list.append(blocks)
-                block_counter += 1
-                visited[blocks[0]] = (node[1],cost)
-                heapq.heappush(heap,(cost,blocks[0])) 
-              
-
-    node = goal
-    while node is not None:
-        path.append(node)
-        grid[node[0]][node[1]] = 3
-        node = visited.get(node, (None,))[0]
-    path.reverse()
-    print(f'Visited Blocks : {len(checked_list)}')
-    print(f'Weight : {weight}')
-
-    return path
+        for neighbor in neighbors_fn(node):
+            if neighbor not in parents:
+                parents[neighbor] = node
+                costs[neighbor] = costs[node] + 1
+                stack.append(neighbor)
+    return _finish(parents, costs, goal, expansions, started, recorder)
 
+# ---------------------
+# UCS
+# ---------------------
+def ucs(start, goal, neighbors_fn, recorder=None, open_list="heap"):
+    """
+    Uniform cost search on a weighted neighbors_fn (cell -> list of (cell, step cost)).
+    :param open_list: "heap" (binary heap) or "buckets" (BucketQueue, integer step costs)
+    :return: SearchResult with a cheapest path
+    """
+    if isinstance(neighbors_fn, GridMap):
+        return _best_first_map(neighbors_fn, start, goal, None, recorder, open_list)
+    return _best_first(start, goal, neighbors_fn, None, recorder, open_list)
 
 # ---------------------
 # A* Search
@@ -143,44 +222,434 @@ def manhattan(a, b):
 def euclidean(a, b):
     return math.sqrt(abs(a[0] - b[0]) ** 2 + abs(a[1] - b[1]) ** 2)
 
-def a_star_search(start, goal, neighbors_fn,heuristic,grid):
-    block_counter = 0
-    checked_list = []
-    heap = []
-    path = []
-    visited = {}
-    visited[start] = (None, 0)
-    heapq.heappush(heap, (0, start)) 
-    
-    while heap :
-        node = heapq.heappop(heap)
-        x,y = node[1][0],node[1][1]
-        grid[x][y] = 2
-        weight = visited[node[1]][1]
-        if node[1] == goal:
+HEURISTICS = {"manhattan": manhattan, "euclidean": euclidean}
+
+def a_star(start, goal, neighbors_fn, heuristic="manhattan", recorder=None, open_list="heap"):
+    """
+    A* on a weighted neighbors_fn.
+    :param heuristic: "manhattan", "euclidean" or a consistent function (cell, goal) -> estimate
+    :param open_list: "heap" or "buckets"; buckets need integer f values, so not "euclidean"
+    :return: SearchResult with a cheapest path
+    """
+    if open_list == "buckets" and heuristic == "euclidean":
+        raise ValueError("the bucket queue needs integer priorities; use a heap for euclidean")
+    if isinstance(neighbors_fn, GridMap):
+        return _best_first_map(neighbors_fn, start, goal, heuristic, recorder, open_list)
+    h = HEURISTICS[heuristic] if isinstance(heuristic, str) else heuristic
+    return _best_first(start, goal, neighbors_fn, lambda cell: h(cell, goal), recorder, open_list)
+
+class BucketQueue:
+    """
+    Dial's bucket queue: buckets[f] holds the items pushed with integer priority f.
+    Pushes are O(1) and pops amortized O(1), because in UCS and in A* with a consistent
+    heuristic nothing is ever pushed below the priority popped last, so the cursor only
+    moves forward. Within a bucket the newest item comes first, which favors the entry
+    that is further along its path (the larger g) like the heap's tie-break.
+    """
+    def __init__(self):
+        self.buckets : list = []
+        self.cursor : int = 0
+        self.size : int = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, priority, item):
+        if priority < self.cursor:
+            raise ValueError(f"priority {priority} is below the last popped {self.cursor}")
+        buckets = self.buckets
+        if priority >= len(buckets):
+            buckets.extend([] for _ in range(priority + 1 - len(buckets)))
+        buckets[priority].append(item)
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        cursor = self.cursor
+        while not buckets[cursor]:
+            cursor += 1
+        self.cursor = cursor
+        self.size -= 1
+        return buckets[cursor].pop()
+
+def _open_list(open_list):
+    if open_list == "heap":
+        return None
+    if open_list == "buckets":
+        return BucketQueue()
+    raise ValueError(f"unknown open_list {open_list!r}")
+
+def _best_first(start, goal, neighbors_fn, h, recorder, open_list):
+    """
+    Shared UCS / A* engine (h None means UCS).
+    - g-scores are relaxed: a cheaper path to a discovered cell replaces the old one
+    - the heap is never searched or updated; entries of cells that were already expanded
+      are skipped when popped (lazy deletion)
+    - an expanded cell is closed for good, which is optimal for consistent heuristics
+      (both grid heuristics are, with step costs >= 1)
+    - ties on f go to the larger g, i.e. the entry that is further along its path
+    - the open list is a binary heap of (f, -g, cell), or a BucketQueue of cells
+    The first entry of a cell to be popped is its cheapest one, so its g is g[cell].
+    """
+    started = time.perf_counter()
+    parents = {start: None}
+    g = {start: 0}
+    closed = set()
+    buckets = _open_list(open_list)
+    heap = [(0 if h is None else h(start), 0, start)]
+    if buckets is not None:
+        buckets.push(heap.pop()[0], start)
+    expansions = 0
+    while heap or buckets:
+        node = heapq.heappop(heap)[2] if buckets is None else buckets.pop()
+        if node in closed:
+            continue
+        closed.add(node)
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(node)
+        if node == goal:
             break
-        for blocks in neighbors_fn(node[1]):
-            h = 0
-            if heuristic == "manhattan":
-                h = manhattan(blocks[0],goal)
-            elif heuristic == "euclidean" :
-                h = euclidean(blocks[0],goal)
-            cost = blocks[1]+ weight
-            # if blocks[0] not in visited or cost < visited[blocks[0]][1]:
-            if blocks[0] not in visited:
-                if blocks not in checked_list: checked_list.append(blocks)
-                block_counter += 1
-                visited[blocks[0]] = (node[1],cost)
-                heapq.heappush(heap,(cost+h,blocks[0]))   
+        weight = g[node]
+        for neighbor, step in neighbors_fn(node):
+            if neighbor in closed:
+                continue
+            cost = weight + step
+            old = g.get(neighbor)
+            if old is None or cost < old:
+                g[neighbor] = cost
+                parents[neighbor] = node
+                f = cost if h is None else cost + h(neighbor)
+                if buckets is None:
+                    heapq.heappush(heap, (f, -cost, neighbor))
+                else:
+                    buckets.push(f, neighbor)
+    return _finish(parents, g, goal, expansions, started, recorder)
 
-    node = goal
-    weight = visited[node][1]
+def _map_heuristic(grid_map, goal, heuristic):
+    """Heuristic on cell ids: None (UCS), a HEURISTICS name, or a function on (x, y) cells."""
+    if heuristic is None:
+        return None
+    if not isinstance(heuristic, str):
+        goal_cell = grid_map.cell(goal)
+        return lambda i: heuristic(grid_map.cell(i), goal_cell)
+    width = grid_map.width
+    gx, gy = divmod(goal, width)
+    if heuristic == "manhattan":
+        def h(i):
+            x, y = divmod(i, width)
+            return abs(x - gx) + abs(y - gy)
+    elif heuristic == "euclidean":
+        def h(i):
+            x, y = divmod(i, width)
+            return math.sqrt((x - gx) ** 2 + (y - gy) ** 2)
+    else:
+        raise KeyError(heuristic)
+    return h
+
+def _best_first_map(grid_map, start, goal, heuristic, recorder, open_list):
+    # _best_first over cell ids: parents, g-scores and the closed set are flat arrays
+    started = time.perf_counter()
+    costs = grid_map.costs
+    offsets = grid_map.offsets
+    start, goal = grid_map.id(start), grid_map.id(goal)
+    h = _map_heuristic(grid_map, goal, heuristic)
+    parents = grid_map.parent_array()
+    parents[start] = start
+    g = array("i", [0]) * grid_map.size
+    closed = bytearray(grid_map.size)
+    buckets = _open_list(open_list)
+    heap = [(0 if h is None else h(start), 0, start)]
+    if buckets is not None:
+        buckets.push(heap.pop()[0], start)
+    expansions = 0
+    generated = 0
+    while heap or buckets:
+        node = heapq.heappop(heap)[2] if buckets is None else buckets.pop()
+        if closed[node]:
+            continue
+        closed[node] = 1
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(grid_map.cell(node))
+        if node == goal:
+            break
+        weight = g[node]
+        for offset in offsets:
+            neighbor = node + offset
+            step = costs[neighbor]
+            if not step or closed[neighbor]:
+                continue
+            cost = weight + step
+            if parents[neighbor] < 0:
+                generated += 1
+            elif cost >= g[neighbor]:
+                continue
+            g[neighbor] = cost
+            parents[neighbor] = node
+            f = cost if h is None else cost + h(neighbor)
+            if buckets is None:
+                heapq.heappush(heap, (f, -cost, neighbor))
+            else:
+                buckets.push(f, neighbor)
+    return _finish_map(grid_map, parents, start, goal, g[goal], expansions, generated, started,
+                       recorder)
+
+# ---------------------
+# Bidirectional search
+# ---------------------
+def _join(forward, backward, meet):
+    """Path start..meet from the forward parents + meet..goal from the backward parents."""
+    path = _reconstruct(forward, meet)
+    node = backward[meet]
     while node is not None:
         path.append(node)
-        grid[node[0]][node[1]] = 3
-        node = visited.get(node, (None,))[0]
+        node = backward[node]
+    return path
+
+def bidirectional_bfs(start, goal, neighbors_fn, recorder=None):
+    """
+    BFS from both ends, one whole layer at a time on the smaller frontier.
+    The first layer that touches the other side holds a shortest path; the whole layer is
+    still scanned so the best meeting point in it is kept.
+    :return: SearchResult with the fewest-steps path
+    """
+    if isinstance(neighbors_fn, GridMap):
+        return _bidirectional_bfs_map(neighbors_fn, start, goal, recorder)
+    started = time.perf_counter()
+    parents = ({start: None}, {goal: None})
+    dist = ({start: 0}, {goal: 0})
+    frontiers = ([start], [goal])
+    expansions = 0
+    best, meet = (0, start) if start == goal else (None, None)
+    while meet is None and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other, seen = parents[side], parents[1 - side], dist[side]
+        layer = []
+        for node in frontiers[side]:
+            expansions += 1
+            if recorder is not None:
+                recorder.expand(node)
+            for neighbor in neighbors_fn(node):
+                if neighbor in mine:
+                    continue
+                mine[neighbor] = node
+                seen[neighbor] = seen[node] + 1
+                layer.append(neighbor)
+                if neighbor in other:
+                    length = seen[neighbor] + dist[1 - side][neighbor]
+                    if best is None or length < best:
+                        best, meet = length, neighbor
+        frontiers = (layer, frontiers[1]) if side == 0 else (frontiers[0], layer)
+
+    path = [] if meet is None else _join(parents[0], parents[1], meet)
+    if recorder is not None:
+        recorder.finish(path)
+    generated = len(parents[0]) + len(parents[1]) - 2
+    return SearchResult(path, best, expansions, generated, time.perf_counter() - started)
+
+def bidirectional_a_star(start, goal, neighbors_fn, heuristic="manhattan", recorder=None):
+    """
+    Bidirectional A* with the average potential p(v) = (h(v, goal) - h(start, v)) / 2:
+    the forward side orders by g + p, the backward side by g - p, which keeps both
+    consistent, so with mu = cost of the best meeting found so far the search can stop
+    as soon as top_forward + top_backward >= mu.
+    A move costs the weight of the cell it enters, so the backward side pays the weight
+    of the cell it expands.
+    :param heuristic: "manhattan", "euclidean" or a consistent, symmetric function
+    :return: SearchResult with a cheapest path
+    """
+    if isinstance(neighbors_fn, GridMap):
+        return _bidirectional_a_star_map(neighbors_fn, start, goal, heuristic, recorder)
+    h = HEURISTICS[heuristic] if isinstance(heuristic, str) else heuristic
+    started = time.perf_counter()
+
+    def potential(cell):
+        return (h(cell, goal) - h(start, cell)) / 2
+
+    # weight of the cell each move enters; the goal's is read off one of its neighbors
+    enter = {}
+    for neighbor, _ in neighbors_fn(goal):
+        enter.update(item for item in neighbors_fn(neighbor) if item[0] == goal)
+        break
+
+    g = ({start: 0}, {goal: 0})
+    parents = ({start: None}, {goal: None})
+    closed = (set(), set())
+    heaps = ([(potential(start), 0, start)], [(-potential(goal), 0, goal)])
+    expansions = 0
+    mu, meet = (0, start) if start == goal else (math.inf, None)
+    while True:
+        for side in (0, 1):
+            heap = heaps[side]
+            while heap and heap[0][2] in closed[side]:
+                heapq.heappop(heap)
+        if not heaps[0] or not heaps[1] or heaps[0][0][0] + heaps[1][0][0] >= mu:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        node = heapq.heappop(heaps[side])[2]
+        closed[side].add(node)
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(node)
+        mine, other = g[side], g[1 - side]
+        weight = mine[node]
+        for neighbor, step in neighbors_fn(node):
+            if side == 1:
+                enter.setdefault(neighbor, step)
+                step = enter[node]
+            if neighbor in closed[side]:
+                continue
+            cost = weight + step
+            old = mine.get(neighbor)
+            if old is None or cost < old:
+                mine[neighbor] = cost
+                parents[side][neighbor] = node
+                p = potential(neighbor)
+                heapq.heappush(heaps[side], (cost + p if side == 0 else cost - p, -cost, neighbor))
+                if neighbor in other and cost + other[neighbor] < mu:
+                    mu, meet = cost + other[neighbor], neighbor
+
+    path = [] if meet is None else _join(parents[0], parents[1], meet)
+    if recorder is not None:
+        recorder.finish(path)
+    generated = len(g[0]) + len(g[1]) - 2
+    return SearchResult(path, mu if path else None, expansions, generated,
+                        time.perf_counter() - started)
+
+def _join_map(grid_map, forward, backward, start, goal, meet):
+    path = []
+    node = meet
+    while node != start:
+        path.append(node)
+        node = forward[node]
+    path.append(start)
     path.reverse()
-    print(f'Visited Blocks : {len(checked_list)}')
-    print(f'Weight : {weight}')
+    node = meet
+    while node != goal:
+        node = backward[node]
+        path.append(node)
+    return [grid_map.cell(i) for i in path]
+
+def _bidirectional_bfs_map(grid_map, start, goal, recorder):
+    started = time.perf_counter()
+    costs = grid_map.costs
+    offsets = grid_map.offsets
+    start, goal = grid_map.id(start), grid_map.id(goal)
+    parents = (grid_map.parent_array(), grid_map.parent_array())
+    dist = (array("i", [0]) * grid_map.size, array("i", [0]) * grid_map.size)
+    parents[0][start] = start
+    parents[1][goal] = goal
+    frontiers = ([start], [goal])
+    expansions = 0
+    generated = 0
+    best, meet = (0, start) if start == goal else (None, None)
+    while meet is None and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other = parents[side], parents[1 - side]
+        seen, other_dist = dist[side], dist[1 - side]
+        layer = []
+        for node in frontiers[side]:
+            expansions += 1
+            if recorder is not None:
+                recorder.expand(grid_map.cell(node))
+            depth = seen[node] + 1
+            for offset in offsets:
+                neighbor = node + offset
+                if not costs[neighbor] or mine[neighbor] >= 0:
+                    continue
+                mine[neighbor] = node
+                seen[neighbor] = depth
+                layer.append(neighbor)
+                if other[neighbor] >= 0 and (best is None or depth + other_dist[neighbor] < best):
+                    best, meet = depth + other_dist[neighbor], neighbor
+        generated += len(layer)
+        frontiers = (layer, frontiers[1]) if side == 0 else (frontiers[0], layer)
+
+    path = [] if meet is None else _join_map(grid_map, parents[0], parents[1], start, goal, meet)
+    if recorder is not None:
+        recorder.finish(path)
+    return SearchResult(path, best, expansions, generated, time.perf_counter() - started)
+
+def _bidirectional_a_star_map(grid_map, start, goal, heuristic, recorder):
+    # bidirectional_a_star over cell ids; the backward side pays costs[node] of the cell it expands
+    started = time.perf_counter()
+    costs = grid_map.costs
+    offsets = grid_map.offsets
+    start, goal = grid_map.id(start), grid_map.id(goal)
+    to_goal = _map_heuristic(grid_map, goal, heuristic)
+    to_start = _map_heuristic(grid_map, start, heuristic)
+    parents = (grid_map.parent_array(), grid_map.parent_array())
+    g = (array("i", [0]) * grid_map.size, array("i", [0]) * grid_map.size)
+    closed = (bytearray(grid_map.size), bytearray(grid_map.size))
+    parents[0][start] = start
+    parents[1][goal] = goal
+    potential_start = (to_goal(start) - to_start(start)) / 2
+    potential_goal = (to_goal(goal) - to_start(goal)) / 2
+    heaps = ([(potential_start, 0, start)], [(-potential_goal, 0, goal)])
+    expansions = 0
+    generated = 0
+    mu, meet = (0, start) if start == goal else (math.inf, None)
+    while True:
+        for side in (0, 1):
+            heap, done = heaps[side], closed[side]
+            while heap and done[heap[0][2]]:
+                heapq.heappop(heap)
+        if not heaps[0] or not heaps[1] or heaps[0][0][0] + heaps[1][0][0] >= mu:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        heap, done = heaps[side], closed[side]
+        mine, mine_g, other, other_g = parents[side], g[side], parents[1 - side], g[1 - side]
+        node = heapq.heappop(heap)[2]
+        done[node] = 1
+        expansions += 1
+        if recorder is not None:
+            recorder.expand(grid_map.cell(node))
+        weight = mine_g[node]
+        for offset in offsets:
+            neighbor = node + offset
+            step = costs[neighbor]
+            if not step or done[neighbor]:
+                continue
+            cost = weight + (step if side == 0 else costs[node])
+            if mine[neighbor] < 0:
+                generated += 1
+            elif cost >= mine_g[neighbor]:
+                continue
+            mine_g[neighbor] = cost
+            mine[neighbor] = node
+            p = (to_goal(neighbor) - to_start(neighbor)) / 2
+            heapq.heappush(heap, (cost + p if side == 0 else cost - p, -cost, neighbor))
+            if other[neighbor] >= 0 and cost + other_g[neighbor] < mu:
+                mu, meet = cost + other_g[neighbor], neighbor
+
+    path = [] if meet is None else _join_map(grid_map, parents[0], parents[1], start, goal, meet)
+    if recorder is not None:
+        recorder.finish(path)
+    return SearchResult(path, mu if path else None, expansions, generated,
+                        time.perf_counter() - started)
+
+# ---------------------
+# Grid-painting wrappers (old interface)
+# ---------------------
+def _paint_and_report(result, recorder, grid):
+    recorder.paint(grid)
+    print(f'Visited Blocks : {result.generated}')
+    print(f'Weight : {result.cost}')
+    return result.path
+
+def breadth_first_search(start, goal, neighbors_fn, grid):
+    recorder = SearchRecorder()
+    return _paint_and_report(bfs(start, goal, neighbors_fn, recorder), recorder, grid)
+
+def depth_first_search(start, goal, neighbors_fn, grid):
+    recorder = SearchRecorder()
+    return _paint_and_report(dfs(start, goal, neighbors_fn, recorder), recorder, grid)
+
+def uniform_cost_search(start, goal, neighbors_fn, grid):
+    recorder = SearchRecorder()
+    return _paint_and_report(ucs(start, goal, neighbors_fn, recorder), recorder, grid)
 
-    return path
\ No newline at end of file
+def a_star_search(start, goal, neighbors_fn, heuristic, grid):
+    recorder = SearchRecorder()
+    return _paint_and_report(a_star(start, goal, neighbors_fn, heuristic, recorder), recorder, grid)